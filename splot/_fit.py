@@ -0,0 +1,78 @@
+from collections import namedtuple
+
+import numpy as np
+
+"""
+Lightweight line fits for splot scatterplots.
+
+Scatterplots only need the slope and intercept of a simple linear
+regression to draw their fit line. These are computed in closed form
+in O(n) with NumPy. `spreg.OLS` is only used on request, for users
+interested in the regression diagnostics.
+"""
+
+FitLine = namedtuple("FitLine", ["intercept", "slope", "ols"])
+FitLine.__doc__ = """
+Simple linear regression ``y = intercept + slope * x``. ``ols`` holds the
+`spreg.OLS` instance if the fit was computed with ``method='ols'``,
+otherwise None.
+"""
+
+_fit_methods = ["closed_form", "ols"]
+
+
+def fit_line(x, y, method="closed_form"):
+    """
+    Fit a simple linear regression of `y` on `x`.
+
+    Parameters
+    ----------
+    x : array
+        (n,), explanatory values.
+    y : array
+        (n,), dependent values.
+    method : str, optional
+        'closed_form' computes slope and intercept with NumPy in O(n).
+        'ols' runs `spreg.OLS`, which additionally provides regression
+        diagnostics through the ``ols`` field of the result.
+        Default ='closed_form'.
+
+    Returns
+    -------
+    fit : FitLine
+        Named tuple of ``intercept``, ``slope`` and ``ols``.
+    """
+    if method not in _fit_methods:
+        raise ValueError(
+            "Fit method {} not supported, use one of {}".format(method, _fit_methods)
+        )
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    if method == "ols":
+        from spreg import OLS
+
+        ols = OLS(y[:, None], x[:, None])
+        intercept, slope = ols.betas.ravel()
+        return FitLine(intercept, slope, ols)
+
+    x_mean = x.mean()
+    y_mean = y.mean()
+    dx = x - x_mean
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.dot(dx, y - y_mean) / np.dot(dx, dx)
+    intercept = y_mean - slope * x_mean
+    return FitLine(intercept, slope, None)
+
+
+def fit_line_endpoints(fit, x):
+    """
+    Evaluate a fitted line at the smallest and largest value of `x`,
+    which is all that is needed to draw it.
+
+    Returns
+    -------
+    xs, ys : ndarray
+        (2,), x and y coordinates of the line endpoints.
+    """
+    xs = np.array([np.min(x), np.max(x)], dtype=float)
+    return xs, fit.intercept + fit.slope * xs
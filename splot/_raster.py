@@ -0,0 +1,125 @@
+import numpy as np
+from matplotlib import colors as mcolors
+
+"""
+Raster rendering backend for very large maps.
+
+Instead of handing one patch per polygon to matplotlib, polygons are
+burned into an RGBA image at the resolution of the target Axes with a
+vectorized even-odd scanline fill in NumPy, and the image is drawn
+with a single `imshow`.
+"""
+
+
+def _ragged_arange(starts, counts):
+    # concatenation of arange(start, start + count) for all pairs
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.arange(counts.sum()) - offsets + np.repeat(starts, counts)
+
+
+def rasterize_polygons(geometry, colors, width, height, extent):
+    """
+    Burn polygons into an RGBA image.
+
+    Parameters
+    ----------
+    geometry : geopandas GeoSeries or array of shapely Polygons
+        (n,), polygon or multi-polygon geometries. Holes are respected.
+    colors : array or list of colors
+        (n,), matplotlib color of each geometry, e.g. color names or
+        RGBA rows as returned by `value_by_alpha_cmap`.
+    width, height : int
+        Size of the image in pixels.
+    extent : tuple
+        (xmin, xmax, ymin, ymax), data coordinates covered by the image.
+
+    Returns
+    -------
+    image : ndarray
+        (height, width, 4), RGBA image with transparent background. The
+        first row covers `ymin`, so the image is drawn with
+        ``origin='lower'``. Pixels are filled if their center lies inside
+        a polygon, later geometries are drawn on top of earlier ones.
+    """
+    import shapely
+
+    width, height = int(width), int(height)
+    rgba = mcolors.to_rgba_array(colors)
+    image = np.zeros((height, width, 4))
+    xmin, xmax, ymin, ymax = extent
+    dx = (xmax - xmin) / width
+    dy = (ymax - ymin) / height
+
+    # all rings (exteriors and holes) and the geometry they belong to
+    parts, part_geom = shapely.get_parts(np.asarray(geometry), return_index=True)
+    rings, ring_part = shapely.get_rings(parts, return_index=True)
+    coords, coord_ring = shapely.get_coordinates(rings, return_index=True)
+    if len(coords) == 0:
+        return image
+    # in pixel units, pixel centers lie at integer + 0.5
+    px = (coords[:, 0] - xmin) / dx
+    py = (coords[:, 1] - ymin) / dy
+
+    # ring edges, skipping the jumps from one ring to the next
+    same_ring = coord_ring[:-1] == coord_ring[1:]
+    x0, y0 = px[:-1][same_ring], py[:-1][same_ring]
+    x1, y1 = px[1:][same_ring], py[1:][same_ring]
+    edge_geom = part_geom[ring_part[coord_ring[:-1][same_ring]]]
+
+    # scanlines crossed by each edge, half-open to count vertices once
+    row_start = np.clip(np.ceil(np.minimum(y0, y1) - 0.5), 0, height).astype(int)
+    row_stop = np.clip(np.ceil(np.maximum(y0, y1) - 0.5), 0, height).astype(int)
+    counts = row_stop - row_start
+    rows = _ragged_arange(row_start, counts)
+    edges = np.repeat(np.arange(len(x0)), counts)
+    t = (rows + 0.5 - y0[edges]) / (y1[edges] - y0[edges])
+    x_cross = x0[edges] + t * (x1[edges] - x0[edges])
+    geoms = edge_geom[edges]
+
+    # pair up crossings of the same geometry and scanline (even-odd rule)
+    order = np.lexsort((x_cross, rows, geoms))
+    x_cross, rows, geoms = x_cross[order], rows[order], geoms[order]
+    col_start = np.clip(np.ceil(x_cross[0::2] - 0.5), 0, width).astype(int)
+    col_stop = np.clip(np.ceil(x_cross[1::2] - 0.5), 0, width).astype(int)
+    span_counts = np.maximum(col_stop - col_start, 0)
+
+    cols = _ragged_arange(col_start, span_counts)
+    span_rows = np.repeat(rows[0::2], span_counts)
+    span_geoms = np.repeat(geoms[0::2], span_counts)
+    image[span_rows, cols] = rgba[span_geoms]
+    return image
+
+
+def raster_plot(geometry, colors, ax, extent=None, **kwargs):
+    """
+    Draw polygons as a single image at the resolution of `ax`.
+
+    Parameters
+    ----------
+    geometry : geopandas GeoSeries
+        (n,), polygon or multi-polygon geometries.
+    colors : array or list of colors
+        (n,), matplotlib color of each geometry.
+    ax : matplotlib Axes instance
+        Axes in which the polygons are drawn.
+    extent : tuple, optional
+        (xmin, xmax, ymin, ymax), data coordinates covered by the image.
+        Default =None, so the bounds of `geometry` are padded to the
+        aspect ratio of `ax`.
+    **kwargs : keyword arguments, optional
+        Keywords passed to `ax.imshow`.
+
+    Returns
+    -------
+    image : matplotlib AxesImage instance
+        The rendered map.
+    """
+    from ._viz_utils import calc_data_aspect
+
+    width = max(int(round(ax.bbox.width)), 1)
+    height = max(int(round(ax.bbox.height)), 1)
+    if extent is None:
+        extent = calc_data_aspect(height, width, geometry.total_bounds)
+    image = rasterize_polygons(geometry, colors, width, height, extent)
+    kwargs.setdefault("interpolation", "nearest")
+    return ax.imshow(image, extent=extent, origin="lower", **kwargs)
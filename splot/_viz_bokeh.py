@@ -1,24 +1,31 @@
+import numpy as np
 import pandas as pd
-
-# import pysal as ps
-import spreg
 from bokeh import palettes
-from bokeh.layouts import gridplot
+from bokeh.layouts import column, gridplot
 from bokeh.models import (
-    CategoricalColorMapper,
     ColumnDataSource,
+    CustomJS,
     GeoJSONDataSource,
     HoverTool,
+    LinearColorMapper,
     Span,
 )
 from bokeh.plotting import figure
-from esda.moran import Moran_Local
 
+from ._fit import fit_line_endpoints
 from ._viz_utils import (
+    _choropleth_labels,
+    _cluster_colors,
+    _cluster_names,
+    _moran_fit,
+    _moran_sample,
+    _moran_scatter_values,
+    _moran_spots,
+    _polygon_xs_ys,
+    _sampled_title,
+    _simplified_gdf,
     add_legend,
-    bin_labels_choropleth,
     calc_data_aspect,
-    mask_local_auto,
 )
 
 """
@@ -44,6 +51,8 @@ def plot_choropleth(
     reverse_colors=False,
     tools="",
     region_column="",
+    columnar=False,
+    simplify=False,
 ):
     """
     Plot Choropleth colored according to attribute
@@ -77,6 +86,16 @@ def plot_choropleth(
     region_column : str, optional
         Column name containing region descpriptions/ names or polygone ids.
         Default = ''.
+    columnar : bool, optional
+        If True, polygon coordinates are sent to the browser as flat
+        binary arrays in a ColumnDataSource instead of GeoJSON text,
+        which is much smaller and faster for large maps. Holes of
+        polygons are not drawn. Default =False.
+    simplify : bool or float, optional
+        If True, geometries are simplified to the pixel size of the map
+        before they are sent to the browser. A float sets the
+        simplification tolerance in the units of the geometries.
+        Default =False.
 
     Returns
     -------
@@ -102,17 +121,23 @@ def plot_choropleth(
     ...                       reverse_colors=True, tools=TOOLS)
     >>> show(fig)
     """
-    # We're adding columns, do that on a copy rather than on the users' input
-    df = df.copy()
-
     # Extract attribute values from df
     attribute_values = df[attribute].values
 
-    # Create bin labels with bin_labels_choropleth()
-    bin_labels = bin_labels_choropleth(df, attribute_values, method, k)
-
-    # Initialize GeoJSONDataSource
-    geo_source = GeoJSONDataSource(geojson=df.to_json())
+    # Create bin labels and bin ids with _choropleth_labels()
+    bin_labels, yb = _choropleth_labels(attribute_values, method, k)
+
+    # Initialize data source with the columns used by glyphs and tooltips
+    columns = {"bin_choro": yb, attribute: attribute_values}
+    geo_source = _geo_source(
+        df,
+        columns,
+        region_column,
+        columnar,
+        simplify=simplify,
+        plot_width=plot_width,
+        plot_height=plot_height,
+    )
 
     fig = _plot_choropleth_fig(
         geo_source,
@@ -131,6 +156,79 @@ def plot_choropleth(
     return fig
 
 
+def _geo_source(
+    df,
+    columns,
+    region_column="",
+    columnar=False,
+    simplify=False,
+    plot_width=500,
+    plot_height=500,
+):
+    """
+    Load the geometries of a geodataframe and the given columns into a
+    Bokeh data source, either as GeoJSON or as flat coordinate columns
+    which Bokeh transfers as binary arrays. Other columns of `df` are
+    left out, and `df` itself is not modified.
+    """
+    columns = dict(columns)
+    if region_column:
+        columns[region_column] = df[region_column].values
+    df = _simplified_gdf(df, simplify, plot_width, plot_height)
+    if not columnar:
+        from geopandas import GeoDataFrame
+
+        slim = GeoDataFrame(columns, geometry=df.geometry.values, index=df.index)
+        return GeoJSONDataSource(geojson=slim.to_json())
+    columns["xs"], columns["ys"] = _polygon_xs_ys(df.geometry)
+    return ColumnDataSource(columns)
+
+
+def _code_color_mapper(palette):
+    """
+    Colour mapper looking up integer codes 0, 1, ... in `palette`.
+    """
+    return LinearColorMapper(palette=palette, low=-0.5, high=len(palette) - 0.5)
+
+
+# recomputes hot and cold spot codes in the browser from the embedded
+# pseudo p-values and quadrants, as _moran_spots does in Python
+_P_SLIDER_JS = """
+const data = source.data;
+const p_sim = data["moranloc_psim"];
+const q = data["moranloc_q"];
+for (const field of fields) {
+    const codes = data[field];
+    for (let i = 0; i < codes.length; i++) {
+        codes[i] = p_sim[i] < cb_obj.value ? q[i] : 0;
+    }
+}
+source.change.emit();
+"""
+
+
+def _p_slider(source, fields, p, p_max=0.2):
+    """
+    Slider for the p-value threshold, recoloring the code columns `fields`
+    of `source` in the browser without a round trip to Python.
+    """
+    from bokeh.models import Slider
+
+    slider = Slider(
+        start=0,
+        end=max(p_max, p),
+        value=p,
+        step=0.001,
+        format="0.000",
+        title="p-value",
+    )
+    slider.js_on_change(
+        "value",
+        CustomJS(args=dict(source=source, fields=list(fields)), code=_P_SLIDER_JS),
+    )
+    return slider
+
+
 def _plot_choropleth_fig(
     geo_source,
     attribute,
@@ -166,10 +264,7 @@ def _plot_choropleth_fig(
     # but currently it is. This looks like a bug in Bokeh
     # where gridplot plus taptool chooses the underlay from the figure
     # that is clicked and applies it to the other figure as well.
-    fill_color = {
-        "field": "labels_choro",
-        "transform": CategoricalColorMapper(palette=colors, factors=bin_labels),
-    }
+    fill_color = {"field": "bin_choro", "transform": _code_color_mapper(colors)}
     fig.patches(
         "xs",
         "ys",
@@ -212,6 +307,9 @@ def lisa_cluster(
     plot_width=500,
     plot_height=500,
     tools="",
+    columnar=False,
+    simplify=False,
+    slider=False,
 ):
     """
     Lisa Cluster map, coloured by local spatial autocorrelation
@@ -221,12 +319,13 @@ def lisa_cluster(
     moran_loc : esda.moran.Moran_Local instance
         values of Moran's Local Autocorrelation Statistic
     df : geopandas dataframe instance
-        In mask_local_auto(), assign df['labels'] per row. Note that
-        ``df`` will be modified, so calling functions uses a copy of
-        the user provided ``df``.
+        Dataframe containing the polygons of the observations in
+        `moran_loc`. Only its geometries and `region_column` are
+        loaded into the plot, ``df`` is not modified.
     p : float, optional
-        The p-value threshold for significance. Points will
-        be colored by significance.
+        The p-value threshold for significance. Polygons will
+        be colored by significance. None uses the default.
+        Default =0.05.
     title : str, optional
         Title of map. Default title=None
     plot_width : int, optional
@@ -235,11 +334,27 @@ def lisa_cluster(
     plot_height : int, optional
         Height dimension of the figure in screen units/ pixels.
         Default = 500
+    columnar : bool, optional
+        If True, polygon coordinates are sent to the browser as flat
+        binary arrays in a ColumnDataSource instead of GeoJSON text,
+        which is much smaller and faster for large maps. Holes of
+        polygons are not drawn. Default =False.
+    simplify : bool or float, optional
+        If True, geometries are simplified to the pixel size of the map
+        before they are sent to the browser. A float sets the
+        simplification tolerance in the units of the geometries.
+        Default =False.
+    slider : bool, optional
+        If True, a slider for the p-value threshold is placed above the
+        map. The pseudo p-values and quadrants are embedded in the
+        document and the map is recolored in the browser.
+        Default =False.
 
     Returns
     -------
     fig : Bokeh figure instance
-        Figure of LISA cluster map, colored by local spatial autocorrelation
+        Figure of LISA cluster map, colored by local spatial autocorrelation.
+        A column layout of the slider and the figure if `slider` is True.
 
     Examples
     --------
@@ -261,23 +376,29 @@ def lisa_cluster(
     >>> fig = lisa_cluster(moran_loc, df, p=0.05, tools=TOOLS)
     >>> show(fig)
     """
-    # We're adding columns, do that on a copy rather than on the users' input
-    df = df.copy()
-
-    # add cluster_labels and colors5 in mask_local_auto
-    cluster_labels, colors5, _, labels = mask_local_auto(moran_loc, p=0.05)
-    df["labels_lisa"] = labels
-    df["moranloc_psim"] = moran_loc.p_sim
-    df["moranloc_q"] = moran_loc.q
+    # the map is always colored by significance, as in plot_local_autocorrelation
+    if p is None:
+        p = 0.05
+    columns = {
+        "cluster_lisa": _moran_spots(moran_loc, p),
+        "moranloc_psim": moran_loc.p_sim,
+        "moranloc_q": moran_loc.q,
+    }
 
-    # load df into bokeh data source
-    geo_source = GeoJSONDataSource(geojson=df.to_json())
+    # load geometries and columns into bokeh data source
+    geo_source = _geo_source(
+        df,
+        columns,
+        region_column,
+        columnar,
+        simplify=simplify,
+        plot_width=plot_width,
+        plot_height=plot_height,
+    )
 
     fig = _lisa_cluster_fig(
         geo_source,
         moran_loc,
-        cluster_labels,
-        colors5,
         bounds=df.total_bounds,
         region_column=region_column,
         title=title,
@@ -285,14 +406,14 @@ def lisa_cluster(
         plot_height=plot_height,
         tools=tools,
     )
+    if slider:
+        return column(_p_slider(geo_source, ["cluster_lisa"], p), fig)
     return fig
 
 
 def _lisa_cluster_fig(
     geo_source,
     moran_loc,
-    cluster_labels,
-    colors5,
     bounds,
     region_column="",
     title=None,
@@ -315,8 +436,8 @@ def _lisa_cluster_fig(
         tools=tools,
     )
     fill_color = {
-        "field": "labels_lisa",
-        "transform": CategoricalColorMapper(palette=colors5, factors=cluster_labels),
+        "field": "cluster_lisa",
+        "transform": _code_color_mapper(list(_cluster_colors)),
     }
     fig.patches(
         "xs",
@@ -342,8 +463,9 @@ def _lisa_cluster_fig(
             ("Quadrant", "@moranloc_q{0}"),
         ]
 
-    # add legend with add_legend()
-    add_legend(fig, cluster_labels, colors5)
+    # add legend with add_legend(), sorted by cluster name
+    order = np.argsort(_cluster_names)
+    add_legend(fig, _cluster_names[order], _cluster_colors[order])
 
     # change layout
     fig.xgrid.grid_line_color = None
@@ -353,7 +475,13 @@ def _lisa_cluster_fig(
 
 
 def moran_scatterplot(
-    moran_loc, p=None, region_column="", plot_width=500, plot_height=500, tools=""
+    moran_loc,
+    p=None,
+    region_column="",
+    plot_width=500,
+    plot_height=500,
+    tools="",
+    max_points=None,
 ):
     """
     Moran Scatterplot, optional coloured by local spatial autocorrelation
@@ -371,6 +499,14 @@ def moran_scatterplot(
     plot_height : int, optional
         Height dimension of the figure in screen units/ pixels.
         Default = 500
+    max_points : int, optional
+        If given and `moran_loc` has more observations, at most
+        `max_points` points are sent to the browser. Hot and cold spots
+        at `p` are always kept, the other points are sampled per
+        scatterplot quadrant and the share of drawn points is added to
+        the title. More than `max_points` hot and cold spots are all
+        kept, with a warning. The fitline is fitted to all observations.
+        Default =None.
 
     Returns
     -------
@@ -397,11 +533,18 @@ def moran_scatterplot(
     >>> fig = moran_scatterplot(moran_loc, p=0.05)
     >>> show(fig)
     """
-    data = _moran_scatterplot_calc(moran_loc, p)
-    source = ColumnDataSource(pd.DataFrame(data))
+    data, fitline = _moran_scatterplot_calc(moran_loc, p)
+    # send a sample of the points, the fit uses all observations
+    sample = _moran_sample(moran_loc, max_points, p)
+    data = pd.DataFrame(data)
+    if sample is not None:
+        data = data.iloc[sample]
+    source = ColumnDataSource(data)
     fig = _moran_scatterplot_fig(
         source,
+        fitline,
         p=p,
+        title=_sampled_title("Moran Scatterplot", sample, len(moran_loc.z)),
         region_column=region_column,
         plot_width=plot_width,
         plot_height=plot_height,
@@ -411,29 +554,34 @@ def moran_scatterplot(
 
 
 def _moran_scatterplot_calc(moran_loc, p):
-    lag = spreg.lag_spatial(moran_loc.w, moran_loc.z)
-    fit = spreg.OLS(moran_loc.z[:, None], lag[:, None])
+    _, lag = _moran_scatter_values(moran_loc)
+    fit = _moran_fit(moran_loc)
     if p is not None:
+        from esda.moran import Moran_Local
+
         if not isinstance(moran_loc, Moran_Local):
             raise ValueError("`moran_loc` is not a esda.moran.Moran_Local instance")
 
-        _, _, colors, _ = mask_local_auto(moran_loc, p=p)
+        cluster = _moran_spots(moran_loc, p)
     else:
-        colors = "black"
+        cluster = np.zeros(len(moran_loc.z), dtype=np.int8)
 
     data = {
         "moran_z": moran_loc.z,
         "lag": lag,
-        "colors": colors,
-        "fit_y": fit.predy.flatten(),
+        "cluster_scatter": cluster,
         "moranloc_psim": moran_loc.p_sim,
         "moranloc_q": moran_loc.q,
     }
-    return data
+    # the fit line only needs its two endpoints
+    fit_x, fit_y = fit_line_endpoints(fit, moran_loc.z)
+    fitline = {"x": fit_x, "y": fit_y}
+    return data, fitline
 
 
 def _moran_scatterplot_fig(
     source,
+    fitline,
     p=None,
     title="Moran Scatterplot",
     region_column="",
@@ -447,6 +595,8 @@ def _moran_scatterplot_fig(
     source : Bokeh ColumnDatasource or GeoJSONDataSource instance
         The data source, should contain the columns ``moran_z`` and ``lag``,
         which will be used as x and y inputs of the scatterplot.
+    fitline : dict
+        Endpoints ``x`` and ``y`` of the moran fitline.
     """
     # Vertical line
     vline = Span(
@@ -475,21 +625,24 @@ def _moran_scatterplot_fig(
         plot_height=plot_height,
         tools=tools,
     )
+    # points are black without significance levels
+    palette = list(_cluster_colors) if p is not None else ["black"]
+    color = {"field": "cluster_scatter", "transform": _code_color_mapper(palette)}
     fig.scatter(
         x="moran_z",
         y="lag",
         source=source,
-        color="colors",
+        color=color,
         size=8,
         fill_alpha=0.6,
         selection_fill_alpha=1,
         selection_line_color="firebrick",
-        selection_fill_color="colors",
+        selection_fill_color=color,
     )
     fig.renderers.extend([vline, hline])
     fig.xgrid.grid_line_color = None
     fig.ygrid.grid_line_color = None
-    fig.line(x="lag", y="fit_y", source=source, line_width=2)  # fit line
+    fig.line(x=fitline["x"], y=fitline["y"], line_width=2)  # fit line
 
     if "hover" in tools:
         hover = fig.select_one(HoverTool)
@@ -513,6 +666,9 @@ def plot_local_autocorrelation(
     method="quantiles",
     k=5,
     reverse_colors=False,
+    columnar=False,
+    simplify=False,
+    slider=False,
 ):
     """
     Plot Moran Scatterplot, LISA cluster and Choropleth
@@ -542,11 +698,28 @@ def plot_local_autocorrelation(
     reverse_colors: boolean
         Reverses the color palette to show lightest colors for
         lowest values in Choropleth map. Default reverse_colors=False
+    columnar : bool, optional
+        If True, polygon coordinates are sent to the browser as flat
+        binary arrays in a ColumnDataSource instead of GeoJSON text,
+        which is much smaller and faster for large maps. Holes of
+        polygons are not drawn. Default =False.
+    simplify : bool or float, optional
+        If True, geometries are simplified to the pixel size of the map
+        before they are sent to the browser. A float sets the
+        simplification tolerance in the units of the geometries.
+        Default =False.
+    slider : bool, optional
+        If True, a slider for the p-value threshold is placed above the
+        plots. The pseudo p-values and quadrants are embedded in the
+        document and the scatterplot and LISA cluster map are recolored
+        in the browser. Without `p` only the map is recolored and the
+        slider starts at 0.05. Default =False.
 
     Returns
     -------
     fig : Bokeh Figure instance
         Figure of Choropleth
+        A column layout of the slider and the figure if `slider` is True.
 
     Examples
     --------
@@ -568,31 +741,33 @@ def plot_local_autocorrelation(
                                          reverse_colors=True)
     >>> show(fig)
     """
-    # We're adding columns, do that on a copy rather than on the users' input
-    df = df.copy()
-
-    # Add relevant results for moran_scatterplot as columns to geodataframe
-    moran_scatterplot_data = _moran_scatterplot_calc(moran_loc, p)
-    for key in moran_scatterplot_data:
-        df[key] = moran_scatterplot_data[key]
-
-    # add cluster_labels and colors5 in mask_local_auto
-    cluster_labels, colors5, _, labels = mask_local_auto(moran_loc, p=0.05)
-    df["labels_lisa"] = labels
-    df["moranloc_psim"] = moran_loc.p_sim
-    df["moranloc_q"] = moran_loc.q
+    # Relevant results for moran_scatterplot
+    columns, fitline = _moran_scatterplot_calc(moran_loc, p)
+
+    # hot and cold spot codes of the LISA cluster map
+    columns["cluster_lisa"] = _moran_spots(moran_loc, p if p is not None else 0.05)
     # Extract attribute values from df
     attribute_values = df[attribute].values
-    # Create bin labels with bin_labels_choropleth()
-    bin_labels = bin_labels_choropleth(df, attribute_values, method, k)
-
-    # load df into bokeh data source
-    geo_source = GeoJSONDataSource(geojson=df.to_json())
+    columns[attribute] = attribute_values
+    # Create bin labels and bin ids with _choropleth_labels()
+    bin_labels, columns["bin_choro"] = _choropleth_labels(attribute_values, method, k)
+
+    # load geometries and columns into bokeh data source
+    geo_source = _geo_source(
+        df,
+        columns,
+        region_column,
+        columnar,
+        simplify=simplify,
+        plot_width=plot_width,
+        plot_height=plot_height,
+    )
 
     TOOLS = "tap,reset,help,hover"
 
     scatter = _moran_scatterplot_fig(
         geo_source,
+        fitline,
         p=p,
         region_column=region_column,
         title="Local Spatial Autocorrelation",
@@ -603,8 +778,6 @@ def plot_local_autocorrelation(
     LISA = _lisa_cluster_fig(
         geo_source,
         moran_loc,
-        cluster_labels,
-        colors5,
         bounds=df.total_bounds,
         region_column=region_column,
         plot_width=plot_width,
@@ -624,4 +797,11 @@ def plot_local_autocorrelation(
     )
 
     fig = gridplot([[scatter, LISA, choro]], sizing_mode="scale_width")
+    if slider:
+        # points stay black without significance levels
+        if p is None:
+            p_slider = _p_slider(geo_source, ["cluster_lisa"], 0.05)
+        else:
+            p_slider = _p_slider(geo_source, ["cluster_lisa", "cluster_scatter"], p)
+        return column(p_slider, fig, sizing_mode="scale_width")
     return fig
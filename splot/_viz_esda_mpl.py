@@ -1,15 +1,25 @@
 import warnings
 
-import geopandas as gpd
 import matplotlib.pyplot as plt
 import numpy
-import seaborn as sbn
-from esda.moran import Moran, Moran_BV, Moran_Local, Moran_Local_BV
-from libpysal.weights.spatial_lag import lag_spatial
 from matplotlib import colors, patches
-from spreg import OLS
 
-from ._viz_utils import mask_local_auto, moran_hot_cold_spots, splot_colors
+from ._fit import fit_line_endpoints
+from ._raster import raster_plot
+from ._viz_utils import (
+    _cluster_categorical,
+    _cluster_colors,
+    _cluster_names,
+    _geometry_paths,
+    _moran_fit,
+    _moran_sample,
+    _moran_scatter_values,
+    _moran_spots,
+    _moran_spots_multi,
+    _sampled_title,
+    _simplified_gdf,
+    splot_colors,
+)
 
 """
 Lightweight visualizations for esda using Matplotlib and Geopandas
@@ -49,6 +59,8 @@ def moran_scatterplot(
     ax=None,
     scatter_kwds=None,
     fitline_kwds=None,
+    fit_method="closed_form",
+    max_points=None,
 ):
     """
     Moran Scatterplot
@@ -78,6 +90,19 @@ def moran_scatterplot(
     fitline_kwds : keyword arguments, optional
         Keywords used for creating and designing the moran fitline.
         Default =None.
+    fit_method : str, optional
+        Method used to fit the moran fitline. 'closed_form' computes
+        slope and intercept directly, 'ols' uses `spreg.OLS`, whose
+        diagnostics are available from `moran_fit`.
+        Default ='closed_form'.
+    max_points : int, optional
+        If given and the statistic has more observations, at most
+        `max_points` points are drawn. Hot and cold spots at `p` are
+        always drawn, the other points are sampled per scatterplot
+        quadrant and the share of drawn points is added to the title.
+        More than `max_points` hot and cold spots are all drawn, with a
+        warning. The fitline is fitted to all observations.
+        Default =None.
 
     Returns
     -------
@@ -126,6 +151,8 @@ def moran_scatterplot(
     >>> plt.show()
 
     """
+    from esda.moran import Moran, Moran_BV, Moran_Local, Moran_Local_BV
+
     if isinstance(moran, Moran):
         if p is not None:
             warnings.warn(
@@ -139,6 +166,8 @@ def moran_scatterplot(
             aspect_equal=aspect_equal,
             scatter_kwds=scatter_kwds,
             fitline_kwds=fitline_kwds,
+            fit_method=fit_method,
+            max_points=max_points,
         )
     elif isinstance(moran, Moran_BV):
         if p is not None:
@@ -152,6 +181,8 @@ def moran_scatterplot(
             aspect_equal=aspect_equal,
             scatter_kwds=scatter_kwds,
             fitline_kwds=fitline_kwds,
+            fit_method=fit_method,
+            max_points=max_points,
         )
     elif isinstance(moran, Moran_Local):
         fig, ax = _moran_loc_scatterplot(
@@ -162,6 +193,8 @@ def moran_scatterplot(
             aspect_equal=aspect_equal,
             scatter_kwds=scatter_kwds,
             fitline_kwds=fitline_kwds,
+            fit_method=fit_method,
+            max_points=max_points,
         )
     elif isinstance(moran, Moran_Local_BV):
         fig, ax = _moran_loc_bv_scatterplot(
@@ -171,12 +204,64 @@ def moran_scatterplot(
             aspect_equal=aspect_equal,
             scatter_kwds=scatter_kwds,
             fitline_kwds=fitline_kwds,
+            fit_method=fit_method,
+            max_points=max_points,
         )
     ax.xaxis.set_ticks_position("bottom")
     ax.yaxis.set_ticks_position("left")
     return fig, ax
 
 
+def moran_fit(moran, zstandard=True, fit_method="closed_form"):
+    """
+    Fit of the moran fitline drawn in a Moran Scatterplot
+
+    Parameters
+    ----------
+    moran : esda.moran instance
+        Values of Moran's I Global, Bivariate and Local
+        Autocorrelation Statistics
+    zstandard : bool, optional
+        If True, the fit is computed on z-standardized values, as in
+        the Moran Scatterplot. Bivariate statistics are always
+        standardized. Default =True.
+    fit_method : str, optional
+        Method used to fit the moran fitline. 'closed_form' computes
+        slope and intercept directly, 'ols' uses `spreg.OLS`.
+        Default ='closed_form'.
+
+    Returns
+    -------
+    fit : namedtuple
+        ``intercept`` and ``slope`` of the fitline and, if `fit_method`
+        is 'ols', the `spreg.OLS` instance with its regression
+        diagnostics as ``ols``, otherwise None.
+
+    Notes
+    -----
+    Fits are cached per statistic, so the fit of a plot drawn with
+    the same `fit_method` is returned without computing it again.
+
+    Examples
+    --------
+    >>> from libpysal.weights.contiguity import Queen
+    >>> from libpysal import examples
+    >>> import geopandas as gpd
+    >>> from esda.moran import Moran_Local
+    >>> from splot.esda import moran_fit, moran_scatterplot
+
+    >>> gdf = gpd.read_file(examples.get_path('columbus.shp'))
+    >>> w = Queen.from_dataframe(gdf)
+    >>> w.transform = 'r'
+    >>> moran_loc = Moran_Local(gdf['HOVAL'].values, w)
+
+    >>> fig, ax = moran_scatterplot(moran_loc, fit_method='ols')
+    >>> print(moran_fit(moran_loc, fit_method='ols').ols.summary)
+
+    """
+    return _moran_fit(moran, zstandard, fit_method)
+
+
 def _moran_global_scatterplot(
     moran,
     zstandard=True,
@@ -184,6 +269,8 @@ def _moran_global_scatterplot(
     ax=None,
     scatter_kwds=None,
     fitline_kwds=None,
+    fit_method="closed_form",
+    max_points=None,
 ):
     """
     Global Moran's I Scatterplot.
@@ -206,6 +293,16 @@ def _moran_global_scatterplot(
     fitline_kwds : keyword arguments, optional
         Keywords used for creating and designing the moran fitline.
         Default =None.
+    fit_method : str, optional
+        Method used to fit the moran fitline. 'closed_form' computes
+        slope and intercept directly, 'ols' uses `spreg.OLS`, whose
+        diagnostics are available from `moran_fit`.
+        Default ='closed_form'.
+    max_points : int, optional
+        If given and the statistic has more observations, at most
+        `max_points` points are drawn, sampled per scatterplot quadrant,
+        and the share of drawn points is added to the title. The fitline
+        is fitted to all observations. Default =None.
 
     Returns
     -------
@@ -274,21 +371,20 @@ def _moran_global_scatterplot(
     ax.set_title("Moran Scatterplot" + " (" + str(round(moran.I, 2)) + ")")
 
     # plot and set standards
+    x, lag = _moran_scatter_values(moran, zstandard)
+    fit = _moran_fit(moran, zstandard, fit_method)
+    # draw a sample of the points, the fit uses all observations
+    sample = _moran_sample(moran, max_points, zstandard=zstandard)
+    points = slice(None) if sample is None else sample
+    ax.set_title(_sampled_title(ax.get_title(), sample, len(x)))
+    # plot
+    ax.scatter(x[points], lag[points], **scatter_kwds)
+    ax.plot(*fit_line_endpoints(fit, x), **fitline_kwds)
     if zstandard is True:
-        lag = lag_spatial(moran.w, moran.z)
-        fit = OLS(lag[:, None], moran.z[:, None])
-        # plot
-        ax.scatter(moran.z, lag, **scatter_kwds)
-        ax.plot(moran.z, fit.predy, **fitline_kwds)
         # v- and hlines
         ax.axvline(0, alpha=0.5, color="k", linestyle="--")
         ax.axhline(0, alpha=0.5, color="k", linestyle="--")
     else:
-        lag = lag_spatial(moran.w, moran.y)
-        b, a = numpy.polyfit(moran.y, lag, 1)
-        # plot
-        ax.scatter(moran.y, lag, **scatter_kwds)
-        ax.plot(moran.y, a + b * moran.y, **fitline_kwds)
         # dashed vert at mean of the attribute
         ax.vlines(moran.y.mean(), lag.min(), lag.max(), alpha=0.5, linestyle="--")
         # dashed horizontal at mean of lagged attribute
@@ -361,6 +457,8 @@ def plot_moran_simulation(
     >>> plt.show()
 
     """
+    import seaborn as sbn
+
     # to set default as an empty dictionary that is later filled with defaults
     if fitline_kwds is None:
         fitline_kwds = dict()
@@ -477,7 +575,13 @@ def plot_moran(
 
 
 def _moran_bv_scatterplot(
-    moran_bv, ax=None, aspect_equal=True, scatter_kwds=None, fitline_kwds=None
+    moran_bv,
+    ax=None,
+    aspect_equal=True,
+    scatter_kwds=None,
+    fitline_kwds=None,
+    fit_method="closed_form",
+    max_points=None,
 ):
     """
     Bivariate Moran Scatterplot.
@@ -498,6 +602,16 @@ def _moran_bv_scatterplot(
     fitline_kwds : keyword arguments, optional
         Keywords used for creating and designing the moran fitline.
         Default =None.
+    fit_method : str, optional
+        Method used to fit the moran fitline. 'closed_form' computes
+        slope and intercept directly, 'ols' uses `spreg.OLS`, whose
+        diagnostics are available from `moran_fit`.
+        Default ='closed_form'.
+    max_points : int, optional
+        If given and the statistic has more observations, at most
+        `max_points` points are drawn, sampled per scatterplot quadrant,
+        and the share of drawn points is added to the title. The fitline
+        is fitted to all observations. Default =None.
 
     Returns
     -------
@@ -566,11 +680,15 @@ def _moran_bv_scatterplot(
     ax.set_title("Bivariate Moran Scatterplot" + " (" + str(round(moran_bv.I, 2)) + ")")
 
     # plot and set standards
-    lag = lag_spatial(moran_bv.w, moran_bv.zy)
-    fit = OLS(lag[:, None], moran_bv.zx[:, None])
+    _, lag = _moran_scatter_values(moran_bv)
+    fit = _moran_fit(moran_bv, method=fit_method)
+    # draw a sample of the points, the fit uses all observations
+    sample = _moran_sample(moran_bv, max_points)
+    points = slice(None) if sample is None else sample
+    ax.set_title(_sampled_title(ax.get_title(), sample, len(lag)))
     # plot
-    ax.scatter(moran_bv.zx, lag, **scatter_kwds)
-    ax.plot(moran_bv.zx, fit.predy, **fitline_kwds)
+    ax.scatter(moran_bv.zx[points], lag[points], **scatter_kwds)
+    ax.plot(*fit_line_endpoints(fit, moran_bv.zx), **fitline_kwds)
     # v- and hlines
     ax.axvline(0, alpha=0.5, color="k", linestyle="--")
     ax.axhline(0, alpha=0.5, color="k", linestyle="--")
@@ -644,6 +762,8 @@ def plot_moran_bv_simulation(
     >>> plt.show()
 
     """
+    import seaborn as sbn
+
     # to set default as an empty dictionary that is later filled with defaults
     if fitline_kwds is None:
         fitline_kwds = dict()
@@ -759,6 +879,8 @@ def _moran_loc_scatterplot(
     ax=None,
     scatter_kwds=None,
     fitline_kwds=None,
+    fit_method="closed_form",
+    max_points=None,
 ):
     """
     Moran Scatterplot with option of coloring of Local Moran Statistics
@@ -783,6 +905,19 @@ def _moran_loc_scatterplot(
     fitline_kwds : keyword arguments, optional
         Keywords used for creating and designing the moran fitline.
         Default =None.
+    fit_method : str, optional
+        Method used to fit the moran fitline. 'closed_form' computes
+        slope and intercept directly, 'ols' uses `spreg.OLS`, whose
+        diagnostics are available from `moran_fit`.
+        Default ='closed_form'.
+    max_points : int, optional
+        If given and the statistic has more observations, at most
+        `max_points` points are drawn. Hot and cold spots at `p` are
+        always drawn, the other points are sampled per scatterplot
+        quadrant and the share of drawn points is added to the title.
+        More than `max_points` hot and cold spots are all drawn, with a
+        warning. The fitline is fitted to all observations.
+        Default =None.
 
     Returns
     -------
@@ -830,7 +965,13 @@ def _moran_loc_scatterplot(
     if fitline_kwds is None:
         fitline_kwds = dict()
 
+    # draw a sample of the points, the fit uses all observations
+    sample = _moran_sample(moran_loc, max_points, p, zstandard)
+    points = slice(None) if sample is None else sample
+
     if p is not None:
+        from esda.moran import Moran_Local
+
         if not isinstance(moran_loc, Moran_Local):
             raise ValueError(
                 "`moran_loc` is not a\n " + "esda.moran.Moran_Local instance"
@@ -842,7 +983,7 @@ def _moran_loc_scatterplot(
             )
 
         # colors
-        spots = moran_hot_cold_spots(moran_loc, p)
+        spots = _moran_spots(moran_loc, p)[points]
         color_all = numpy.array(["#bababa", "#d7191c", "#abd9e9", "#2c7bb6", "#fdae61"])
         hmap = colors.ListedColormap(color_all[list(numpy.unique(spots))])
 
@@ -857,15 +998,14 @@ def _moran_loc_scatterplot(
     # set labels
     ax.set_xlabel("Attribute")
     ax.set_ylabel("Spatial Lag")
-    ax.set_title("Moran Local Scatterplot")
+    ax.set_title(_sampled_title("Moran Local Scatterplot", sample, len(moran_loc.z)))
 
     # plot and set standards
+    _, lag = _moran_scatter_values(moran_loc, zstandard)
+    fit = _moran_fit(moran_loc, zstandard, fit_method)
+    x_points = (moran_loc.z if zstandard is True else moran_loc.y)[points]
+    lag_points = lag[points]
     if zstandard is True:
-        lag = lag_spatial(moran_loc.w, moran_loc.z)
-        fit = OLS(
-            lag[:, None],
-            moran_loc.z[:, None],
-        )
         # v- and hlines
         ax.axvline(0, alpha=0.5, color="k", linestyle="--")
         ax.axhline(0, alpha=0.5, color="k", linestyle="--")
@@ -873,17 +1013,16 @@ def _moran_loc_scatterplot(
             fitline_kwds.setdefault("color", "k")
             scatter_kwds.setdefault("cmap", hmap)
             scatter_kwds.setdefault("c", numpy.sort(spots))
-            ax.plot(moran_loc.z, fit.predy, **fitline_kwds)
-            ax.scatter(moran_loc.z[spots.argsort()], lag[spots.argsort()],
-                       **scatter_kwds)
+            ax.plot(*fit_line_endpoints(fit, moran_loc.z), **fitline_kwds)
+            ax.scatter(
+                x_points[spots.argsort()], lag_points[spots.argsort()], **scatter_kwds
+            )
         else:
             scatter_kwds.setdefault("color", splot_colors["moran_base"])
             fitline_kwds.setdefault("color", splot_colors["moran_fit"])
-            ax.plot(moran_loc.z, fit.predy, **fitline_kwds)
-            ax.scatter(moran_loc.z, lag, **scatter_kwds)
+            ax.plot(*fit_line_endpoints(fit, moran_loc.z), **fitline_kwds)
+            ax.scatter(x_points, lag_points, **scatter_kwds)
     else:
-        lag = lag_spatial(moran_loc.w, moran_loc.y)
-        b, a = numpy.polyfit(moran_loc.y, lag, 1)
         # dashed vert at mean of the attribute
         ax.vlines(moran_loc.y.mean(), lag.min(), lag.max(), alpha=0.5, linestyle="--")
         # dashed horizontal at mean of lagged attribute
@@ -894,19 +1033,28 @@ def _moran_loc_scatterplot(
             fitline_kwds.setdefault("color", "k")
             scatter_kwds.setdefault("cmap", hmap)
             scatter_kwds.setdefault("c", numpy.sort(spots))
-            ax.plot(moran_loc.y, a + b * moran_loc.y, **fitline_kwds)
-            ax.scatter(moran_loc.y[spots.argsort()], lag[spots.argsort()],
-                       **scatter_kwds)
+            ax.plot(*fit_line_endpoints(fit, moran_loc.y), **fitline_kwds)
+            ax.scatter(
+                x_points[spots.argsort()], lag_points[spots.argsort()], **scatter_kwds
+            )
         else:
             scatter_kwds.setdefault("c", splot_colors["moran_base"])
             fitline_kwds.setdefault("color", splot_colors["moran_fit"])
-            ax.plot(moran_loc.y, a + b * moran_loc.y, **fitline_kwds)
-            ax.scatter(moran_loc.y, lag, **scatter_kwds)
+            ax.plot(*fit_line_endpoints(fit, moran_loc.y), **fitline_kwds)
+            ax.scatter(x_points, lag_points, **scatter_kwds)
     return fig, ax
 
 
 def lisa_cluster(
-    moran_loc, gdf, p=0.05, ax=None, legend=True, legend_kwds=None, **kwargs
+    moran_loc,
+    gdf,
+    p=0.05,
+    ax=None,
+    legend=True,
+    legend_kwds=None,
+    simplify=False,
+    raster=False,
+    **kwargs,
 ):
     """
     Create a LISA Cluster map
@@ -931,8 +1079,19 @@ def lisa_cluster(
         Dictionary to control legend formatting options. Example:
         ``legend_kwds={'loc': 'upper left', 'bbox_to_anchor': (0.92, 1.05)}``
         Default = None
+    simplify : bool or float, optional
+        If True, geometries are simplified to the pixel size of the map
+        before drawing. A float sets the simplification tolerance in the
+        units of the geometries. Default =False, so full resolution
+        geometries are drawn.
+    raster : bool, optional
+        If True, polygons are burned into a single image at the resolution
+        of the Axes instead of being drawn as one patch each, which is much
+        faster and lighter for maps with very many polygons. Polygon
+        outlines are not drawn. Default =False.
     **kwargs : keyword arguments, optional
-        Keywords designing and passed to geopandas.GeoDataFrame.plot().
+        Keywords designing and passed to geopandas.GeoDataFrame.plot(),
+        or to matplotlib's imshow if `raster` is True.
 
     Returns
     -------
@@ -968,20 +1127,59 @@ def lisa_cluster(
     >>> plt.show()
 
     """
-    # retrieve colors5 and labels from mask_local_auto
-    _, colors5, _, labels = mask_local_auto(moran_loc, p=p)
-
-    # define ListedColormap
-    hmap = colors.ListedColormap(colors5)
-
     if ax is None:
         figsize = kwargs.pop("figsize", None)
         fig, ax = plt.subplots(1, figsize=figsize)
     else:
         fig = ax.get_figure()
 
+    _lisa_cluster_map(
+        _moran_spots(moran_loc, p),
+        gdf,
+        ax,
+        legend=legend,
+        legend_kwds=legend_kwds,
+        simplify=simplify,
+        raster=raster,
+        **kwargs,
+    )
+    return fig, ax
+
+
+def _lisa_cluster_map(
+    cluster,
+    gdf,
+    ax,
+    legend=True,
+    legend_kwds=None,
+    simplify=False,
+    raster=False,
+    **kwargs,
+):
+    """
+    Draw a LISA Cluster map from hot and cold spot codes, see `lisa_cluster`.
+    """
+    # cluster codes as categories of the present clusters and their colors
+    labels, colors5 = _cluster_categorical(cluster)
+
+    # define ListedColormap
+    hmap = colors.ListedColormap(colors5)
+
+    gdf = _simplified_gdf(gdf, simplify, ax.bbox.width, ax.bbox.height)
+
     # check for Polygon, else no edgecolor
-    if gdf.geom_type.isin(["Polygon", "MultiPolygon"]).any():
+    is_polygon = gdf.geom_type.isin(["Polygon", "MultiPolygon"])
+    if raster and is_polygon.all():
+        cluster_colors = colors.to_rgba_array(_cluster_colors)[cluster]
+        raster_plot(gdf.geometry, cluster_colors, ax, **kwargs)
+        if legend:
+            # same entries as the categorical legend of geopandas
+            handles = [
+                patches.Patch(facecolor=color, label=label)
+                for label, color in zip(labels.categories, colors5)
+            ]
+            ax.legend(handles=handles, **(legend_kwds or {}))
+    elif is_polygon.any():
         gdf.assign(cl=labels).plot(
             column="cl",
             categorical=True,
@@ -1008,7 +1206,149 @@ def lisa_cluster(
         )
     ax.set_axis_off()
     ax.set_aspect("equal")
-    return fig, ax
+
+
+def batch_lisa_cluster(
+    jobs, gdf, out_dir, n_jobs=-1, p=0.05, figsize=None, dpi=None, fmt="png", **kwargs
+):
+    """
+    Render many LISA Cluster maps of the same geometries to files
+
+    Parameters
+    ----------
+    jobs : dict or iterable of tuples
+        Name and esda.moran.Moran_Local or Moran_Local_BV instance of each
+        map, e.g. ``{'HOVAL': moran_loc_hoval, 'CRIME': moran_loc_crime}``.
+        Tuples can carry the p-value threshold of the map as third item,
+        e.g. ``('HOVAL_01', moran_loc_hoval, 0.01)``. The name is used as
+        file name and must not contain path separators.
+    gdf : geopandas dataframe instance
+        The Dataframe containing the geometries of all maps.
+    out_dir : str
+        Directory the maps are saved in. Created if it does not exist.
+    n_jobs : int, optional
+        Number of worker processes. -1 uses all available cores, 1 renders
+        all maps in the current process. Default =-1.
+    p : float, optional
+        The p-value threshold for significance of jobs without their
+        own threshold. Polygons will be colored by significance.
+        Default =0.05.
+    figsize : tuple, optional
+        W, h of each figure. Default =None, so matplotlib's default size.
+    dpi : float, optional
+        Resolution of the saved maps. Default =None, so matplotlib's
+        default resolution.
+    fmt : str, optional
+        File format and extension of the saved maps. Default ='png'.
+    **kwargs : keyword arguments, optional
+        Keywords passed to `lisa_cluster`, e.g. ``legend``, ``simplify``
+        or ``raster``.
+
+    Returns
+    -------
+    paths : list of str
+        Paths of the saved maps, in the order of `jobs`.
+
+    Notes
+    -----
+    `gdf` is sent to each worker once. Jobs only carry the hot and cold
+    spot codes of each statistic, computed for all thresholds of a
+    statistic in one pass, and workers save their maps directly
+    to `out_dir`. Figures are created without pyplot and rendered with
+    the Agg backend, so the interactive backend of the calling process
+    is not touched. Workers are started with the 'spawn' method, so
+    scripts using more than one job need an ``if __name__ == '__main__':``
+    guard.
+
+    Examples
+    --------
+    >>> from libpysal.weights.contiguity import Queen
+    >>> from libpysal import examples
+    >>> import geopandas as gpd
+    >>> from esda.moran import Moran_Local
+    >>> from splot.esda import batch_lisa_cluster
+
+    >>> gdf = gpd.read_file(examples.get_path('columbus.shp'))
+    >>> w = Queen.from_dataframe(gdf)
+    >>> w.transform = 'r'
+    >>> jobs = {col: Moran_Local(gdf[col].values, w)
+    ...         for col in ['HOVAL', 'CRIME', 'INC']}
+    >>> paths = batch_lisa_cluster(jobs, gdf, 'lisa_maps')
+
+    """
+    import os
+
+    os.makedirs(out_dir, exist_ok=True)
+    if hasattr(jobs, "items"):
+        jobs = jobs.items()
+    paths, stats, thresholds = [], [], {}
+    for job in jobs:
+        name, moran_loc = job[:2]
+        # names are file names, they must not point outside of out_dir
+        name = str(name)
+        separators = (os.path.sep, os.path.altsep or os.path.sep)
+        if name in ("", ".", "..") or any(sep in name for sep in separators):
+            raise ValueError("job name {!r} is not a plain file name".format(name))
+        paths.append(os.path.join(out_dir, "{}.{}".format(name, fmt)))
+        stats.append(id(moran_loc))
+        thresholds.setdefault(id(moran_loc), (moran_loc, []))[1].append(
+            job[2] if len(job) > 2 else p
+        )
+    # all thresholds of a statistic are classified in one pass
+    spots = {
+        key: iter(_moran_spots_multi(moran_loc, ps))
+        for key, (moran_loc, ps) in thresholds.items()
+    }
+    clusters = [numpy.asarray(next(spots[key]), dtype=numpy.int8) for key in stats]
+    render_kwds = dict(figsize=figsize, dpi=dpi, **kwargs)
+
+    if n_jobs == 1:
+        return [
+            _render_lisa_cluster(path, cluster, gdf, **render_kwds)
+            for path, cluster in zip(paths, clusters)
+        ]
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    max_workers = None if n_jobs in (None, -1) else n_jobs
+    # forked workers can deadlock once numba's threading layer has been
+    # started in this process, e.g. by esda or giddy, so spawn them fresh
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_batch_lisa_init,
+        initargs=(gdf, render_kwds),
+    ) as pool:
+        return list(pool.map(_batch_lisa_task, paths, clusters))
+
+
+# geometries and plot settings shared by all jobs of a batch_lisa_cluster worker
+_batch_lisa_state = {}
+
+
+def _batch_lisa_init(gdf, render_kwds):
+    _batch_lisa_state["gdf"] = gdf
+    _batch_lisa_state["render_kwds"] = render_kwds
+
+
+def _batch_lisa_task(path, cluster):
+    return _render_lisa_cluster(
+        path,
+        cluster,
+        _batch_lisa_state["gdf"],
+        **_batch_lisa_state["render_kwds"],
+    )
+
+
+def _render_lisa_cluster(path, cluster, gdf, figsize=None, dpi=None, **kwargs):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    _lisa_cluster_map(cluster, gdf, ax, **kwargs)
+    fig.savefig(path, dpi=dpi)
+    return path
 
 
 def plot_local_autocorrelation(
@@ -1027,6 +1367,7 @@ def plot_local_autocorrelation(
     figsize=(15, 4),
     scatter_kwds=None,
     fitline_kwds=None,
+    simplify=False,
 ):
     """
     Produce three-plot visualisation of Moran Scatteprlot, LISA cluster
@@ -1071,6 +1412,11 @@ def plot_local_autocorrelation(
     fitline_kwds : keyword arguments, optional
         Keywords used for creating and designing the moran fitline
         in the scatterplot. Default =None.
+    simplify : bool or float, optional
+        If True, geometries are simplified to the pixel size of the map
+        before drawing. A float sets the simplification tolerance in the
+        units of the geometries. Default =False, so full resolution
+        geometries are drawn.
 
     Returns
     -------
@@ -1108,6 +1454,8 @@ def plot_local_autocorrelation(
     >>> plt.show()
 
     """
+    import geopandas as gpd
+
     fig, axs = plt.subplots(
         1, 3, figsize=figsize, subplot_kw={"aspect": "equal", "adjustable": "datalim"}
     )
@@ -1120,6 +1468,9 @@ def plot_local_autocorrelation(
     else:
         axs[0].set_aspect("auto")
 
+    # both maps share the same size and geometries
+    gdf = _simplified_gdf(gdf, simplify, axs[1].bbox.width, axs[1].bbox.height)
+
     # Lisa cluster map
     # TODO: Fix legend_kwds: display boxes instead of points
     lisa_cluster(
@@ -1220,8 +1571,9 @@ def plot_local_autocorrelation(
             )
 
         df_mask = gdf[ix]
-        x_mask = moran_loc.z[ix]
-        y_mask = lag_spatial(moran_loc.w, moran_loc.z)[ix]
+        x_values, lag = _moran_scatter_values(moran_loc)
+        x_mask = x_values[ix]
+        y_mask = lag[ix]
         axs[0].plot(
             x_mask,
             y_mask,
@@ -1242,6 +1594,179 @@ def plot_local_autocorrelation(
     return fig, axs
 
 
+def local_autocorrelation_explorer(
+    moran_loc,
+    gdf,
+    p=0.05,
+    p_max=0.2,
+    aspect_equal=True,
+    legend=True,
+    figsize=(12, 6),
+    scatter_kwds=None,
+    fitline_kwds=None,
+    simplify=False,
+):
+    """
+    Moran Scatterplot and LISA cluster map with a slider for the p-value
+
+    Parameters
+    ----------
+    moran_loc : esda.moran.Moran_Local or Moran_Local_BV instance
+        Values of Moran's Local Autocorrelation Statistic
+    gdf : geopandas dataframe
+        The Dataframe containing the geometries to plot.
+    p : float, optional
+        Initial p-value threshold for significance. Points and polygons
+        will be colored by significance. Default = 0.05.
+    p_max : float, optional
+        Upper end of the slider. Default = 0.2
+    aspect_equal : bool, optional
+        If True, Axes of Moran Scatterplot will show the same
+        aspect or visual proportions.
+    legend: boolean, optional
+        If True, legend for the map will be depicted. Default = True
+    figsize: tuple, optional
+        W, h of figure. Default = (12,6)
+    scatter_kwds : keyword arguments, optional
+        Keywords used for creating and designing the scatter points.
+        Default =None.
+    fitline_kwds : keyword arguments, optional
+        Keywords used for creating and designing the moran fitline
+        in the scatterplot. Default =None.
+    simplify : bool or float, optional
+        If True, geometries are simplified to the pixel size of the map
+        before drawing. A float sets the simplification tolerance in the
+        units of the geometries. Default =False, so full resolution
+        geometries are drawn.
+
+    Returns
+    -------
+    fig : Matplotlib figure instance
+        Moran Scatterplot and LISA cluster map.
+    axs : list of Matplotlib axes
+        Axes of the scatterplot, the map and the slider.
+    slider : matplotlib.widgets.Slider instance
+        Slider setting the p-value. Keep a reference to it, the slider
+        only responds as long as it is alive.
+
+    Notes
+    -----
+    The points of the scatterplot and the geometries of the map are each
+    drawn once as a single collection. Moving the slider only recolors
+    the observations whose significance changed between the old and the
+    new threshold, found from the observations sorted by pseudo p-value,
+    and no artists are created.
+
+    Examples
+    --------
+    >>> import matplotlib.pyplot as plt
+    >>> from libpysal.weights.contiguity import Queen
+    >>> from libpysal import examples
+    >>> import geopandas as gpd
+    >>> from esda.moran import Moran_Local
+    >>> from splot.esda import local_autocorrelation_explorer
+
+    >>> gdf = gpd.read_file(examples.get_path('columbus.shp'))
+    >>> w = Queen.from_dataframe(gdf)
+    >>> w.transform = 'r'
+    >>> moran_loc = Moran_Local(gdf['HOVAL'].values, w)
+
+    >>> fig, axs, slider = local_autocorrelation_explorer(moran_loc, gdf)
+    >>> plt.show()
+
+    """
+    from matplotlib.collections import PathCollection
+    from matplotlib.widgets import Slider
+
+    if scatter_kwds is None:
+        scatter_kwds = dict()
+    if fitline_kwds is None:
+        fitline_kwds = dict()
+    scatter_kwds.setdefault("alpha", 0.6)
+    scatter_kwds.setdefault("s", 40)
+    fitline_kwds.setdefault("alpha", 0.9)
+    fitline_kwds.setdefault("color", "k")
+
+    # observations by pseudo p-value, the first n are significant at any
+    # threshold between the n-th and the (n+1)-th p-value
+    p_sim = numpy.asarray(moran_loc.p_sim)
+    order = numpy.argsort(p_sim, kind="stable")
+    p_sorted = p_sim[order]
+    cluster_rgba = colors.to_rgba_array(_cluster_colors)
+    quadrant_rgba = cluster_rgba[numpy.asarray(moran_loc.q)]
+    n_sig = numpy.searchsorted(p_sorted, p)
+    facecolors = numpy.broadcast_to(cluster_rgba[0], quadrant_rgba.shape).copy()
+    facecolors[order[:n_sig]] = quadrant_rgba[order[:n_sig]]
+
+    fig, axs = plt.subplots(
+        1, 2, figsize=figsize, subplot_kw={"aspect": "equal", "adjustable": "datalim"}
+    )
+    fig.subplots_adjust(bottom=0.2)
+
+    # Moran Scatterplot
+    x, lag = _moran_scatter_values(moran_loc)
+    fit = _moran_fit(moran_loc)
+    axs[0].axvline(0, alpha=0.5, color="k", linestyle="--")
+    axs[0].axhline(0, alpha=0.5, color="k", linestyle="--")
+    axs[0].plot(*fit_line_endpoints(fit, x), **fitline_kwds)
+    points = axs[0].scatter(x, lag, c=facecolors, **scatter_kwds)
+    axs[0].set_xlabel("Attribute")
+    axs[0].set_ylabel("Spatial Lag")
+    axs[0].set_title("Moran Local Scatterplot")
+    if aspect_equal is not True:
+        axs[0].set_aspect("auto")
+
+    # Lisa cluster map
+    gdf = _simplified_gdf(gdf, simplify, axs[1].bbox.width, axs[1].bbox.height)
+    is_polygon = gdf.geom_type.isin(["Polygon", "MultiPolygon"])
+    is_point = gdf.geom_type.isin(["Point", "MultiPoint"])
+    if is_point.all():
+        xy = gdf.geometry.representative_point()
+        regions = axs[1].scatter(xy.x, xy.y, c=facecolors)
+        set_colors = regions.set_facecolor
+    else:
+        regions = PathCollection(_geometry_paths(gdf.geometry))
+        if is_polygon.all():
+            regions.set(facecolor=facecolors, edgecolor="white", linewidth=0.1)
+            set_colors = regions.set_facecolor
+        else:
+            regions.set(facecolor="none", edgecolor=facecolors, linewidth=1.5)
+            set_colors = regions.set_edgecolor
+        axs[1].add_collection(regions)
+        axs[1].autoscale_view()
+    axs[1].set_axis_off()
+    if legend:
+        # all clusters, as any of them can appear while sliding
+        labels = numpy.argsort(_cluster_names)
+        handles = [
+            patches.Patch(facecolor=cluster_rgba[i], label=_cluster_names[i])
+            for i in labels
+        ]
+        axs[1].legend(handles=handles, loc="upper left", bbox_to_anchor=(0.92, 1.05))
+
+    slider_ax = fig.add_axes([0.25, 0.06, 0.5, 0.03])
+    slider = Slider(slider_ax, "p-value", 0, max(p_max, p), valinit=p, valfmt="%.3f")
+    state = {"n_sig": n_sig}
+
+    def _update(value):
+        n_new = numpy.searchsorted(p_sorted, value)
+        n_old = state["n_sig"]
+        if n_new == n_old:
+            return
+        if n_new > n_old:
+            changed = order[n_old:n_new]
+            facecolors[changed] = quadrant_rgba[changed]
+        else:
+            facecolors[order[n_new:n_old]] = cluster_rgba[0]
+        state["n_sig"] = n_new
+        points.set_facecolor(facecolors)
+        set_colors(facecolors)
+        fig.canvas.draw_idle()
+
+    slider.on_changed(_update)
+    return fig, [axs[0], axs[1], slider_ax], slider
+
+
 def _moran_loc_bv_scatterplot(
     moran_loc_bv,
     p=None,
@@ -1249,6 +1774,8 @@ def _moran_loc_bv_scatterplot(
     ax=None,
     scatter_kwds=None,
     fitline_kwds=None,
+    fit_method="closed_form",
+    max_points=None,
 ):
     """
     Moran Bivariate Scatterplot with option of coloring of Local Moran Statistics
@@ -1273,6 +1800,19 @@ def _moran_loc_bv_scatterplot(
     fitline_kwds : keyword arguments, optional
         Keywords used for creating and designing the moran fitline.
         Default =None.
+    fit_method : str, optional
+        Method used to fit the moran fitline. 'closed_form' computes
+        slope and intercept directly, 'ols' uses `spreg.OLS`, whose
+        diagnostics are available from `moran_fit`.
+        Default ='closed_form'.
+    max_points : int, optional
+        If given and the statistic has more observations, at most
+        `max_points` points are drawn. Hot and cold spots at `p` are
+        always drawn, the other points are sampled per scatterplot
+        quadrant and the share of drawn points is added to the title.
+        More than `max_points` hot and cold spots are all drawn, with a
+        warning. The fitline is fitted to all observations.
+        Default =None.
 
     Returns
     -------
@@ -1322,6 +1862,8 @@ def _moran_loc_bv_scatterplot(
         fitline_kwds = dict()
 
     if p is not None:
+        from esda.moran import Moran_Local_BV
+
         if not isinstance(moran_loc_bv, Moran_Local_BV):
             raise ValueError(
                 "`moran_loc_bv` is not a\n" + "esda.moran.Moran_Local_BV instance"
@@ -1333,7 +1875,7 @@ def _moran_loc_bv_scatterplot(
             )
 
         # colors
-        spots_bv = moran_hot_cold_spots(moran_loc_bv, p)
+        spots_bv = _moran_spots(moran_loc_bv, p)
         hmap = colors.ListedColormap(
             ["#bababa", "#d7191c", "#abd9e9", "#2c7bb6", "#fdae61"]
         )
@@ -1352,22 +1894,26 @@ def _moran_loc_bv_scatterplot(
     ax.set_title("Moran BV Local Scatterplot")
 
     # plot and set standards
-    lag = lag_spatial(moran_loc_bv.w, moran_loc_bv.zy)
-    fit = OLS(lag[:, None], moran_loc_bv.zx[:, None])
+    _, lag = _moran_scatter_values(moran_loc_bv)
+    fit = _moran_fit(moran_loc_bv, method=fit_method)
+    # draw a sample of the points, the fit uses all observations
+    sample = _moran_sample(moran_loc_bv, max_points, p)
+    points = slice(None) if sample is None else sample
+    ax.set_title(_sampled_title(ax.get_title(), sample, len(lag)))
     # v- and hlines
     ax.axvline(0, alpha=0.5, color="k", linestyle="--")
     ax.axhline(0, alpha=0.5, color="k", linestyle="--")
     if p is not None:
         fitline_kwds.setdefault("color", "k")
         scatter_kwds.setdefault("cmap", hmap)
-        scatter_kwds.setdefault("c", spots_bv)
-        ax.plot(moran_loc_bv.zx, fit.predy, **fitline_kwds)
-        ax.scatter(moran_loc_bv.zx, lag, **scatter_kwds)
+        scatter_kwds.setdefault("c", spots_bv[points])
+        ax.plot(*fit_line_endpoints(fit, moran_loc_bv.zx), **fitline_kwds)
+        ax.scatter(moran_loc_bv.zx[points], lag[points], **scatter_kwds)
     else:
         scatter_kwds.setdefault("color", splot_colors["moran_base"])
         fitline_kwds.setdefault("color", splot_colors["moran_fit"])
-        ax.plot(moran_loc_bv.zx, fit.predy, **fitline_kwds)
-        ax.scatter(moran_loc_bv.zx, lag, **scatter_kwds)
+        ax.plot(*fit_line_endpoints(fit, moran_loc_bv.zx), **fitline_kwds)
+        ax.scatter(moran_loc_bv.zx[points], lag[points], **scatter_kwds)
     return fig, ax
 
 
@@ -1444,6 +1990,8 @@ def moran_facet(
     >>> plt.show()
 
     """
+    from esda.moran import Moran
+
     nrows = int(numpy.sqrt(len(moran_matrix))) + 1
     ncols = nrows
 
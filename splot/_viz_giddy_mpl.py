@@ -1,12 +1,13 @@
+from collections import namedtuple
+
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import numpy as np
-import seaborn as sns
-from esda.moran import Moran_Local
-from giddy.directional import Rose
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.transforms import Affine2D
 
 from ._viz_esda_mpl import lisa_cluster
-from ._viz_utils import moran_hot_cold_spots
+from ._viz_utils import MPL_36, _LRUCache, _moran_spots, moran_hot_cold_spots_multi
 
 """
 Lightweight visualizations for pysal dynamics using Matplotlib and Geopandas
@@ -20,41 +21,80 @@ TODO
 __author__ = "Stefanie Lumnitz <stefanie.lumitz@gmail.com>"
 
 
+def _lisa_transitions(clusters):
+    """
+    Count transitions between hot and cold spot codes of consecutive
+    time periods.
+
+    Parameters
+    ----------
+    clusters : array
+        (n, T), hot and cold spot codes 0-4 of n observations over T
+        periods, as returned by `moran_hot_cold_spots`.
+
+    Returns
+    -------
+    transitions : ndarray
+        (T-1, 5, 5), ``transitions[t, i, j]`` is the number of
+        observations in cluster i in period t and in cluster j in
+        period t+1.
+    """
+    clusters = np.asarray(clusters)
+    n_periods = clusters.shape[1]
+    transitions = np.empty((n_periods - 1, 5, 5), dtype=int)
+    # one pass per period keeps the memory footprint at O(n)
+    for t in range(n_periods - 1):
+        codes = 5 * clusters[:, t].astype(np.intp) + clusters[:, t + 1]
+        transitions[t] = np.bincount(codes, minlength=25).reshape(5, 5)
+    return transitions
+
+
 def _dynamic_lisa_heatmap_data(moran_locy, moran_locx, p=0.05):
     """
     Utility function to calculate dynamic lisa heatmap table
     and diagonal color mask
     """
-    clustery = moran_hot_cold_spots(moran_locy, p=p)
-    clusterx = moran_hot_cold_spots(moran_locx, p=p)
+    clustery = _moran_spots(moran_locy, p)
+    clusterx = _moran_spots(moran_locx, p)
 
     # to put into seaborn function
     # and set diagonal elements to zero to see the rest better
-    heatmap_data = np.zeros((5, 5), dtype=int)
-    mask = np.zeros((5, 5), dtype=bool)
-    for row in range(5):
-        for col in range(5):
-            yr1 = clustery == row
-            yr2 = clusterx == col
-            heatmap_data[row, col] = (yr1 & yr2).sum()
-            if row == col:
-                mask[row, col] = True
+    heatmap_data = _lisa_transitions(np.column_stack((clustery, clusterx)))[0]
+    mask = np.eye(5, dtype=bool)
     return heatmap_data, mask
 
 
-def _moran_loc_from_rose_calc(rose):
+def _permutation_seed(seed=None):
+    """
+    Seed for the permutations of esda.moran.Moran_Local
+
+    Without a `seed`, it is derived with a `numpy.random.SeedSequence`
+    from the global NumPy random state, which is read but not modified,
+    so results remain reproducible with ``np.random.seed()``.
+    """
+    if seed is not None:
+        return seed
+    _, key, pos, _, _ = np.random.get_state()
+    entropy = np.append(key, pos).astype(np.uint32)
+    return int(np.random.SeedSequence(entropy).generate_state(1)[0])
+
+
+def _moran_loc_from_rose_calc(rose, seed=None, n_jobs=1):
     """
     Calculate esda.moran.Moran_Local values from giddy.rose object
+
+    Both points in time are computed with the same seed, so that they
+    share their permutations.
     """
-    old_state = np.random.get_state()
-    moran_locy = Moran_Local(rose.Y[:, 0], rose.w)
-    np.random.set_state(old_state)
-    moran_locx = Moran_Local(rose.Y[:, 1], rose.w)
-    np.random.set_state(old_state)
+    from esda.moran import Moran_Local
+
+    seed = _permutation_seed(seed)
+    moran_locy = Moran_Local(rose.Y[:, 0], rose.w, n_jobs=n_jobs, seed=seed)
+    moran_locx = Moran_Local(rose.Y[:, 1], rose.w, n_jobs=n_jobs, seed=seed)
     return moran_locy, moran_locx
 
 
-def dynamic_lisa_heatmap(rose, p=0.05, ax=None, **kwargs):
+def dynamic_lisa_heatmap(rose, p=0.05, ax=None, seed=None, n_jobs=1, **kwargs):
     """
     Heatmap indicating significant transition of LISA values
     over time inbetween Moran Scatterplot quadrants
@@ -70,6 +110,13 @@ def dynamic_lisa_heatmap(rose, p=0.05, ax=None, **kwargs):
     ax : Matplotlib Axes instance, optional
         If given, the figure will be created inside this axis.
         Default =None.
+    seed : int, optional
+        Seed for the permutations of `esda.moran.Moran_Local`, shared by
+        both points in time. Default =None, derived from the global NumPy
+        random state without changing it.
+    n_jobs : int, optional
+        Number of cores used for the permutations of
+        `esda.moran.Moran_Local`, -1 uses all cores. Default =1.
     **kwargs : keyword arguments, optional
         Keywords used for creating and designing the heatmap.
         These are passed on to `seaborn.heatmap()`.
@@ -134,7 +181,7 @@ def dynamic_lisa_heatmap(rose, p=0.05, ax=None, **kwargs):
     >>> plt.show()
 
     """
-    moran_locy, moran_locx = _moran_loc_from_rose_calc(rose)
+    moran_locy, moran_locx = _moran_loc_from_rose_calc(rose, seed=seed, n_jobs=n_jobs)
     fig, ax = _dynamic_lisa_heatmap(moran_locy, moran_locx, p=p, ax=ax, **kwargs)
     return fig, ax
 
@@ -143,6 +190,8 @@ def _dynamic_lisa_heatmap(moran_locy, moran_locx, p, ax, **kwargs):
     """
     Create dynamic_lisa_heatmap figure from esda.moran.Moran_local values
     """
+    import seaborn as sns
+
     heatmap_data, diagonal_mask = _dynamic_lisa_heatmap_data(moran_locy, moran_locx, p)
     # set default plot style
     annot = kwargs.pop("annot", True)
@@ -165,7 +214,7 @@ def _dynamic_lisa_heatmap(moran_locy, moran_locx, p, ax, **kwargs):
         ax=ax,
         cbar=cbar,
         square=square,
-        **kwargs
+        **kwargs,
     )
     ax.set_xlabel("End time")
     ax.set_ylabel("Start time")
@@ -326,7 +375,38 @@ def _add_arrow(line, position=None, direction="right", size=15, color=None):
     )
 
 
-def dynamic_lisa_vectors(rose, ax=None, arrows=True, **kwargs):
+def _arrowheads(start, end, size=6.0):
+    """
+    Triangular arrowheads pointing from `start` to `end`.
+
+    Parameters
+    ----------
+    start, end : ndarray
+        (n,2), start and end points of the vectors.
+    size : float, optional
+        Length of the arrowheads in points. Default =6.
+
+    Returns
+    -------
+    heads : ndarray
+        (m,3,2), vertices in points relative to the tip of each head.
+    tips : ndarray
+        (m,2), end points of the m vectors with a non-zero length.
+    """
+    direction = end - start
+    length = np.hypot(direction[:, 0], direction[:, 1])
+    moving = length > 0
+    unit = direction[moving] / length[moving, None]
+    normal = np.column_stack((-unit[:, 1], unit[:, 0]))
+    base = -size * unit
+    heads = np.stack(
+        (np.zeros_like(unit), base + 0.4 * size * normal, base - 0.4 * size * normal),
+        axis=1,
+    )
+    return heads, end[moving]
+
+
+def dynamic_lisa_vectors(rose, ax=None, arrows=True, collection=False, **kwargs):
     """
     Plot vectors of positional transition of LISA values
     in Moran scatterplot
@@ -342,8 +422,14 @@ def dynamic_lisa_vectors(rose, ax=None, arrows=True, **kwargs):
         Default =None.
     arrows : boolean, optional
         If True show arrowheads of vectors. Default =True
+    collection : boolean, optional
+        If True, all vectors are drawn as a single LineCollection and all
+        arrowheads as a single PolyCollection instead of one line and one
+        annotation per observation, which scales to hundreds of thousands
+        of vectors. Default =False
     **kwargs : keyword arguments, optional
-        Keywords used for creating and designing the `matplotlib.pyplot.plot()`
+        Keywords used for creating and designing the `matplotlib.pyplot.plot()`,
+        or the `matplotlib.collections.LineCollection` if `collection` is True.
 
     Returns
     -------
@@ -421,22 +507,45 @@ def dynamic_lisa_vectors(rose, ax=None, arrows=True, **kwargs):
         color = kwargs.pop("color", "b")
         can_insert_colorbar = False
 
-    xs = []
-    ys = []
-    for i in range(len(rose.Y)):
-        # Plot a vector from xy_start to xy_end
-        xs.append(rose.Y[i, :])
-        ys.append(rose.wY[i, :])
-
-    xs = np.asarray(xs).T
-    ys = np.asarray(ys).T
-    lines = ax.plot(xs, ys, color=color, **kwargs)
-    if can_insert_colorbar:
-        fig.colorbar(lines)
+    if collection:
+        start = np.column_stack((rose.Y[:, 0], rose.wY[:, 0]))
+        end = np.column_stack((rose.Y[:, 1], rose.wY[:, 1]))
+        ax.add_collection(
+            LineCollection(np.stack((start, end), axis=1), colors=color, **kwargs)
+        )
+        if arrows:
+            heads, tips = _arrowheads(start, end)
+            # heads are sized in points and placed at the tips in data units
+            offset_kwds = {
+                "offset_transform" if MPL_36 else "transOffset": ax.transData
+            }
+            ax.add_collection(
+                PolyCollection(
+                    heads,
+                    offsets=tips,
+                    transform=Affine2D().scale(1 / 72) + fig.dpi_scale_trans,
+                    facecolors=color,
+                    edgecolors="none",
+                    **offset_kwds,
+                )
+            )
+    else:
+        xs = []
+        ys = []
+        for i in range(len(rose.Y)):
+            # Plot a vector from xy_start to xy_end
+            xs.append(rose.Y[i, :])
+            ys.append(rose.wY[i, :])
+
+        xs = np.asarray(xs).T
+        ys = np.asarray(ys).T
+        lines = ax.plot(xs, ys, color=color, **kwargs)
+        if can_insert_colorbar:
+            fig.colorbar(lines)
 
-    if arrows:
-        for line in lines:
-            _add_arrow(line)
+        if arrows:
+            for line in lines:
+                _add_arrow(line)
 
     ax.axis("equal")
     ax.set_xlim(xlim)
@@ -444,7 +553,7 @@ def dynamic_lisa_vectors(rose, ax=None, arrows=True, **kwargs):
     return fig, ax
 
 
-def dynamic_lisa_composite(rose, gdf, p=0.05, figsize=(13, 10)):
+def dynamic_lisa_composite(rose, gdf, p=0.05, figsize=(13, 10), seed=None, n_jobs=1):
     """
     Composite visualisation for dynamic LISA values over two points in time.
     Includes dynamic lisa heatmap, dynamic lisa rose plot,
@@ -462,6 +571,13 @@ def dynamic_lisa_composite(rose, gdf, p=0.05, figsize=(13, 10)):
         The p-value threshold for significance. Default =0.05.
     figsize: tuple, optional
         W, h of figure. Default =(13,10)
+    seed : int, optional
+        Seed for the permutations of `esda.moran.Moran_Local`, shared by
+        both points in time. Default =None, derived from the global NumPy
+        random state without changing it.
+    n_jobs : int, optional
+        Number of cores used for the permutations of
+        `esda.moran.Moran_Local`, -1 uses all cores. Default =1.
 
     Returns
     -------
@@ -526,8 +642,13 @@ def dynamic_lisa_composite(rose, gdf, p=0.05, figsize=(13, 10)):
     """
     # Moran_Local uses random numbers,
     # which we cannot change between the two years!
-    moran_locy, moran_locx = _moran_loc_from_rose_calc(rose)
+    moran_locy, moran_locx = _moran_loc_from_rose_calc(rose, seed=seed, n_jobs=n_jobs)
+    return _dynamic_lisa_composite(
+        rose, moran_locy, moran_locx, gdf, p=p, figsize=figsize
+    )
+
 
+def _dynamic_lisa_composite(rose, moran_locy, moran_locx, gdf, p, figsize):
     # initialize figure
     fig = plt.figure(figsize=figsize)
     fig.suptitle("Space-time autocorrelation", fontsize=20)
@@ -581,12 +702,47 @@ def dynamic_lisa_composite(rose, gdf, p=0.05, figsize=(13, 10)):
     return fig, axs
 
 
+def _moran_loc_columns(data, w, permutations=999, seed=None, n_jobs=1, maxsize=16):
+    """
+    Memoized esda.moran.Moran_Local values of columns of `data`
+
+    Returns a function computing the Moran_Local instance of a column,
+    cached by column name, weights and transformation, permutations and
+    seed. At most `maxsize` instances are kept, the least recently used
+    one is dropped first. All columns use the same seed, see
+    `_permutation_seed`, so that any two cached columns share their
+    permutations like `_moran_loc_from_rose_calc`.
+    """
+    from esda.moran import Moran_Local
+
+    cache = _LRUCache(maxsize=maxsize)
+    seed = _permutation_seed(seed)
+
+    def moran_loc(column):
+        return cache.get(
+            (column, w.transform, permutations, seed),
+            lambda: Moran_Local(
+                np.asarray(data[column]),
+                w,
+                permutations=permutations,
+                n_jobs=n_jobs,
+                seed=seed,
+            ),
+            owner=w,
+        )
+
+    moran_loc.cache = cache
+    return moran_loc
+
+
 def _dynamic_lisa_widget_update(
-    rose, gdf, start_time, end_time, p=0.05, figsize=(13, 10)
+    rose, gdf, start_time, end_time, p=0.05, figsize=(13, 10), moran_loc=None
 ):
     """
     Update rose values if widgets are used
     """
+    from giddy.directional import Rose
+
     # determine rose object for (timex, timey),
     # which comes from interact widgets
     y1 = gdf[start_time].values
@@ -594,10 +750,23 @@ def _dynamic_lisa_widget_update(
     Y = np.array([y1, y2]).T
     rose_update = Rose(Y, rose.w, k=5)
 
-    fig, _ = dynamic_lisa_composite(rose_update, gdf, p=p, figsize=figsize)
+    if moran_loc is None:
+        fig, _ = dynamic_lisa_composite(rose_update, gdf, p=p, figsize=figsize)
+    else:
+        # reuse Moran_Local values of periods which were already analysed
+        fig, _ = _dynamic_lisa_composite(
+            rose_update,
+            moran_loc(start_time),
+            moran_loc(end_time),
+            gdf,
+            p=p,
+            figsize=figsize,
+        )
 
 
-def dynamic_lisa_composite_explore(rose, gdf, pattern="", p=0.05, figsize=(13, 10)):
+def dynamic_lisa_composite_explore(
+    rose, gdf, pattern="", p=0.05, figsize=(13, 10), permutations=999, seed=None
+):
     """
     Interactive exploration of dynamic LISA values
     for different dates in a dataframe.
@@ -617,11 +786,23 @@ def dynamic_lisa_composite_explore(rose, gdf, pattern="", p=0.05, figsize=(13, 1
         The p-value threshold for significance. Default =0.05
     figsize: tuple, optional
         W, h of figure. Default =(13,10)
+    permutations : int, optional
+        Number of random permutations for the calculation of pseudo
+        p-values of `esda.moran.Moran_Local`. Default =999.
+    seed : int, optional
+        Seed of the permutations. Default =None, so the current global
+        random state is used.
 
     Returns
     -------
     None
 
+    Notes
+    -----
+    `esda.moran.Moran_Local` values are computed once per column and
+    reused whenever a column is selected again, so only novel columns
+    trigger the permutation inference.
+
     Examples
     --------
     **Note**: this function creates Jupyter notebook widgets, so is meant only
@@ -692,4 +873,204 @@ def dynamic_lisa_composite_explore(rose, gdf, pattern="", p=0.05, figsize=(13, 1
         gdf=fixed(gdf),
         p=fixed(p),
         figsize=fixed(figsize),
+        moran_loc=fixed(
+            _moran_loc_columns(gdf, rose.w, permutations=permutations, seed=seed)
+        ),
+    )
+
+
+# hot and cold spot codes of moran_hot_cold_spots and their labels
+_cluster_codes = ["ns", "HH", "LH", "LL", "HL"]
+
+LisaPanel = namedtuple(
+    "LisaPanel", ["Y", "wY", "moran_locs", "clusters", "transitions"]
+)
+LisaPanel.__doc__ = """
+Shared state of a dynamic LISA panel of n observations over T periods:
+values ``Y`` (n, T), their spatial lags ``wY`` (n, T), the
+esda.moran.Moran_Local instance of each period ``moran_locs`` (T,),
+hot and cold spot codes ``clusters`` (n, T) and the stack of transition
+counts between consecutive periods ``transitions`` (T-1, 5, 5).
+"""
+
+
+def _dynamic_lisa_panel_calc(Y, w, p=0.05, permutations=999, seed=None, n_jobs=1):
+    """
+    Compute the local statistics of every period of a panel exactly once
+    """
+    from libpysal.weights.spatial_lag import lag_spatial
+
+    Y = np.asarray(Y, dtype=float)
+    moran_loc = _moran_loc_columns(
+        dict(enumerate(Y.T)), w, permutations=permutations, seed=seed, n_jobs=n_jobs
+    )
+    moran_locs = [moran_loc(t) for t in range(Y.shape[1])]
+    # classified directly, T periods would crowd other plots out of the cache
+    clusters = np.column_stack(
+        [moran_hot_cold_spots_multi(m, [p])[0] for m in moran_locs]
+    )
+    return LisaPanel(
+        Y, lag_spatial(w, Y), moran_locs, clusters, _lisa_transitions(clusters)
+    )
+
+
+def dynamic_lisa_panel(
+    Y,
+    w,
+    p=0.05,
+    permutations=999,
+    seed=None,
+    n_jobs=1,
+    labels=None,
+    color="b",
+    ncols=6,
+    figsize=None,
+):
+    """
+    Dynamic LISA trajectories, rose charts and transitions of a panel
+    over more than two points in time.
+
+    Parameters
+    ----------
+    Y : array
+        (n, T), values of n observations over T periods.
+    w : libpysal.W object
+        Spatial weights of the observations.
+    p : float, optional
+        The p-value threshold for significance of the transitions.
+        Default =0.05.
+    permutations : int, optional
+        Number of random permutations for the calculation of pseudo
+        p-values of `esda.moran.Moran_Local`. Default =999.
+    seed : int, optional
+        Seed of the permutations. Default =None, so all periods share the
+        permutations drawn from the current global random state.
+    n_jobs : int, optional
+        Number of cores used by `esda.moran.Moran_Local` for the
+        permutation inference of each period. Default =1.
+    labels : list of str, optional
+        (T,), names of the periods. Default =None, so periods are numbered.
+    color : str, optional
+        Color of the trajectories and rose points. Default ='b'.
+    ncols : int, optional
+        Maximum number of rose charts per row. Default =6.
+    figsize : tuple, optional
+        W, h of figure. Default =None, so the size grows with the
+        number of rose charts.
+
+    Returns
+    -------
+    fig : Matplotlib Figure instance
+        Dynamic LISA panel figure.
+    axs : list of matplotlib Axes instances
+        Trajectories, transition heatmap and one rose chart per step.
+    panel : LisaPanel
+        Values, spatial lags, esda.moran.Moran_Local instances, hot and
+        cold spot codes and transition counts of all periods.
+
+    Examples
+    --------
+    >>> import geopandas as gpd
+    >>> import pandas as pd
+    >>> from libpysal.weights.contiguity import Queen
+    >>> from libpysal import examples
+    >>> import matplotlib.pyplot as plt
+    >>> from splot.giddy import dynamic_lisa_panel
+
+    >>> gdf = gpd.read_file(examples.get_path('us48.shp'))
+    >>> income_table = pd.read_csv(examples.get_path("usjoin.csv"))
+    >>> gdf = gdf.merge(income_table, left_on='STATE_NAME', right_on='Name')
+    >>> w = Queen.from_dataframe(gdf)
+    >>> w.transform = 'r'
+    >>> years = [str(year) for year in range(1969, 2010, 5)]
+    >>> Y = (gdf[years] / gdf[years].mean()).values
+
+    >>> fig, axs, panel = dynamic_lisa_panel(Y, w, labels=years)
+    >>> plt.show()
+
+    """
+    import seaborn as sns
+
+    Y = np.asarray(Y)
+    if Y.ndim != 2 or Y.shape[1] < 2:
+        raise ValueError(
+            "`Y` needs the values of at least two periods as columns, "
+            "got an array of shape {}".format(Y.shape)
+        )
+    panel = _dynamic_lisa_panel_calc(
+        Y, w, p=p, permutations=permutations, seed=seed, n_jobs=n_jobs
+    )
+    n_steps = panel.Y.shape[1] - 1
+    if labels is None:
+        labels = [str(t) for t in range(n_steps + 1)]
+
+    ncols = max(min(n_steps, ncols), 2)
+    nrows = -(-n_steps // ncols)
+    if figsize is None:
+        figsize = (2.5 * ncols, 5 + 2.5 * nrows)
+    fig = plt.figure(figsize=figsize)
+    grid = fig.add_gridspec(1 + nrows, ncols, height_ratios=[2] + [1] * nrows)
+    half = ncols // 2
+
+    # full trajectories through the Moran scatterplot
+    ax = fig.add_subplot(grid[0, :half])
+    points = np.stack((panel.Y, panel.wY), axis=2)
+    ax.add_collection(LineCollection(points, colors=color, linewidths=0.8))
+    heads, tips = _arrowheads(points[:, -2], points[:, -1])
+    offset_kwds = {"offset_transform" if MPL_36 else "transOffset": ax.transData}
+    ax.add_collection(
+        PolyCollection(
+            heads,
+            offsets=tips,
+            transform=Affine2D().scale(1 / 72) + fig.dpi_scale_trans,
+            facecolors=color,
+            edgecolors="none",
+            **offset_kwds,
+        )
+    )
+    ax.axis("equal")
+    ax.set_xlim(panel.Y.min(), panel.Y.max())
+    ax.set_ylim(panel.wY.min(), panel.wY.max())
+    ax.set_xlabel("Value")
+    ax.set_ylabel("Spatial Lag")
+    ax.set_title("Trajectories {} - {}".format(labels[0], labels[-1]))
+    axs = [ax]
+
+    # stacked transitions between clusters, without staying in a cluster
+    ax = fig.add_subplot(grid[0, half:])
+    off_diagonal = ~np.eye(5, dtype=bool)
+    transition_labels = [
+        "{}-{}".format(start, end)
+        for start in _cluster_codes
+        for end in _cluster_codes
+        if start != end
+    ]
+    step_labels = [
+        "{}-{}".format(start, end) for start, end in zip(labels[:-1], labels[1:])
+    ]
+    sns.heatmap(
+        panel.transitions[:, off_diagonal],
+        cmap="YlGnBu",
+        xticklabels=transition_labels,
+        yticklabels=step_labels,
+        ax=ax,
     )
+    ax.set_title("Transitions")
+    axs.append(ax)
+
+    # rose chart of each step
+    rose_style = {"grid.color": "w", "axes.edgecolor": "w", "axes.facecolor": "#E5E5E5"}
+    dx = np.diff(panel.Y, axis=1)
+    dy = np.diff(panel.wY, axis=1)
+    theta = np.arctan2(dy, dx) % (2 * np.pi)
+    r = np.hypot(dx, dy)
+    for t in range(n_steps):
+        with mpl.rc_context(rose_style):
+            ax = fig.add_subplot(grid[1 + t // ncols, t % ncols], projection="polar")
+        ax.scatter(theta[:, t], r[:, t], color=color, alpha=0.9, s=8)
+        ax.set_rlabel_position(315)
+        ax.set_title(step_labels[t], fontsize="small")
+        axs.append(ax)
+
+    fig.tight_layout()
+    return fig, axs, panel
@@ -2,6 +2,8 @@ import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.collections import LineCollection
 
+from ._viz_utils import _simplified_gdf
+
 """
 Lightweight visualizations for libpysal using Matplotlib and Geopandas
 
@@ -21,6 +23,9 @@ def plot_spatial_weights(
     node_kws=None,
     edge_kws=None,
     nonplanar_edge_kws=None,
+    symmetric=None,
+    simplify=False,
+    use_index=False,
 ):
     """
     Plot spatial weights network.
@@ -36,7 +41,8 @@ def plot_spatial_weights(
         modelled in W.
     indexed_on : str, optional
         Column of gdf which the weights object uses as an index.
-        Default =None, so the geodataframe's index is used.
+        Default =None, so the ids of `w` are row positions of gdf,
+        unless `use_index` is True.
     ax : matplotlib axis, optional
         Axis on which to plot the weights.
         Default =None, so plots on the current figure.
@@ -55,6 +61,20 @@ def plot_spatial_weights(
         which provide fine-grained control over the aesthetics
         of the edges from `weights.non_planar_joins` in the plot.
         Default =None.
+    symmetric : bool, optional
+        If True, every pair of neighbors is joined by a single edge.
+        If False, each directed edge i->j is drawn, so that edges of
+        symmetric weights are drawn twice. Default =None, so edges are
+        drawn once if the neighbor relations of `w` are symmetric.
+    simplify : bool or float, optional
+        If True, the shapes of the base layer are simplified to the pixel
+        size of the map before drawing. A float sets the simplification
+        tolerance in the units of the geometries. Centroids are always
+        computed from the original shapes. Default =False.
+    use_index : bool, optional
+        If True and `indexed_on` is None, the ids of `w` are labels of
+        the geodataframe's index, e.g. for weights built with
+        ``from_dataframe(gdf, use_index=True)``. Default =False.
 
     Returns
     -------
@@ -111,66 +131,136 @@ def plot_spatial_weights(
         nonplanar_edge_kws = edge_kws.copy()
         nonplanar_edge_kws["colors"] = "#d6604d"
 
-    node_has_nonplanar_join = []
-    if hasattr(w, "non_planar_joins"):
-        # This attribute is present when an instance is created by the user
-        # calling `weights.util.nonplanar_neighbors`. If so, treat those
-        # edges differently by default.
-        node_has_nonplanar_join = w.non_planar_joins.keys()
-
-    centroids_shp = gdf.centroid.values
-
-    segments = []
-    non_planar_segments = []
-
-    if indexed_on is not None:
-        dict_index = dict(zip(gdf[indexed_on].values, range(len(gdf))))
-        for idx in w.id_order:
-            if idx in w.islands:
-                continue
-            # Find the centroid of the polygon we're looking at now
-            origin = np.array(centroids_shp[dict_index[idx]].coords)[0]
-            for jdx in w.neighbors[idx]:
-                dest = np.array(centroids_shp[dict_index[jdx]].coords)[0]
-                if (idx in node_has_nonplanar_join) and (
-                    jdx in w.non_planar_joins[idx]
-                ):
-                    # This is a non-planar edge
-                    non_planar_segments.append([origin, dest])
-                else:
-                    segments.append([origin, dest])
-    else:
-        for idx in w.id_order:
-            if idx in w.islands:
-                continue
-
-            # Find the centroid of the polygon we're looking at now
-            origin = np.array(centroids_shp[idx].coords)[0]
-            for j in w.neighbors[idx]:
-                jdx = w.id2i[j]
-                dest = np.array(centroids_shp[jdx].coords)[0]
-                if (idx in node_has_nonplanar_join) and (
-                    jdx in w.non_planar_joins[idx]
-                ):
-                    # This is a non-planar edge
-                    non_planar_segments.append([origin, dest])
-                else:
-                    segments.append([origin, dest])
+    centroids = gdf.centroid
+    coords = np.column_stack((centroids.x.values, centroids.y.values))
+    rows = _weights_gdf_rows(w, gdf, indexed_on, use_index)
+    segments, non_planar_segments = _weights_segments(
+        w, coords[rows], symmetric=symmetric
+    )
 
     # Plot the polygons from the geodataframe as a base layer
-    gdf.plot(ax=ax, color="#bababa", edgecolor="w")
+    base = _simplified_gdf(gdf, simplify, ax.bbox.width, ax.bbox.height)
+    base.plot(ax=ax, color="#bababa", edgecolor="w")
 
     # plot polygon centroids
-    gdf.centroid.plot(ax=ax, **node_kws)
+    centroids.plot(ax=ax, **node_kws)
 
     # plot weight edges
-    non_planar_segs_plot = LineCollection(
-        np.array(non_planar_segments), **nonplanar_edge_kws
-    )
-    segs_plot = LineCollection(np.array(segments), **edge_kws)
+    non_planar_segs_plot = LineCollection(non_planar_segments, **nonplanar_edge_kws)
+    segs_plot = LineCollection(segments, **edge_kws)
     ax.add_collection(segs_plot)
     ax.add_collection(non_planar_segs_plot)
 
     ax.set_axis_off()
     ax.set_aspect("equal")
     return fig, ax
+
+
+def _weights_gdf_rows(w, gdf, indexed_on=None, use_index=False):
+    """
+    Positions of the rows of `gdf` matching ``w.id_order``.
+
+    Parameters
+    ----------
+    w : libpysal.W object
+        Values of libpysal weights object.
+    gdf : geopandas dataframe
+        The original shapes whose topological relations are
+        modelled in W.
+    indexed_on : str, optional
+        Column of gdf which the weights object uses as an index.
+        Duplicated ids use the last matching row. Default =None.
+    use_index : bool, optional
+        If True and `indexed_on` is None, the ids of `w` are looked up
+        in the geodataframe's index. Default =False, so the ids are
+        row positions.
+
+    Returns
+    -------
+    rows : ndarray
+        (n,), row position in `gdf` of each observation in `w`.
+    """
+    import pandas as pd
+
+    if indexed_on is None and not use_index:
+        rows = np.asarray(w.id_order)
+        if rows.size and (
+            rows.dtype.kind not in "iu" or rows.min() < 0 or rows.max() >= len(gdf)
+        ):
+            raise ValueError(
+                "ids of w are not row positions of gdf, "
+                "set `indexed_on` or `use_index`"
+            )
+        return rows.astype(np.intp)
+
+    index = gdf.index if indexed_on is None else pd.Index(gdf[indexed_on])
+    positions = np.arange(len(index))
+    if not index.is_unique:
+        # the last row of a duplicated id is used
+        last = ~index.duplicated(keep="last")
+        index, positions = index[last], positions[last]
+    rows = index.get_indexer(w.id_order)
+    if (rows < 0).any():
+        where = "the index" if indexed_on is None else "column " + indexed_on
+        raise KeyError("ids of w not found in {} of gdf".format(where))
+    return positions[rows]
+
+
+def _weights_segments(w, coords, symmetric=None):
+    """
+    Build the edge segments of a spatial weights graph from the
+    sparse representation of `w`.
+
+    Parameters
+    ----------
+    w : libpysal.W object
+        Values of libpysal weights object. Edges listed in
+        `w.non_planar_joins` are returned separately.
+    coords : ndarray
+        (n,2), node coordinates ordered as ``w.id_order``.
+    symmetric : bool, optional
+        If True, return one segment per pair of neighbors. If False,
+        return one segment per directed edge. Default =None, so
+        symmetry is detected from the sparsity pattern of `w`.
+
+    Returns
+    -------
+    segments : ndarray
+        (m,2,2), start and end point of each planar edge.
+    non_planar_segments : ndarray
+        (k,2,2), start and end point of each non-planar edge.
+    """
+    from scipy import sparse
+
+    adjacency = w.sparse.astype(bool)
+    if symmetric is None:
+        symmetric = (adjacency != adjacency.T).nnz == 0
+    if symmetric:
+        # keep the upper triangle of the undirected graph
+        adjacency = sparse.triu(adjacency + adjacency.T)
+    adjacency = adjacency.tocoo()
+    i = adjacency.row.astype(np.int64)
+    j = adjacency.col.astype(np.int64)
+    segments = np.stack((coords[i], coords[j]), axis=1)
+
+    non_planar_joins = getattr(w, "non_planar_joins", None)
+    if not non_planar_joins:
+        return segments, segments[:0]
+    # This attribute is present when an instance is created by the user
+    # calling `weights.util.nonplanar_neighbors`. Encode its edges in the
+    # same way as the sparse matrix entries to split them off with a mask.
+    id2i = w.id2i
+    non_planar = np.array(
+        [
+            id2i[idx] * w.n + id2i[jdx]
+            for idx, neighbors in non_planar_joins.items()
+            for jdx in neighbors
+        ],
+        dtype=np.int64,
+    )
+    if symmetric:
+        non_planar = np.concatenate(
+            (non_planar, (non_planar % w.n) * w.n + non_planar // w.n)
+        )
+    mask = np.isin(i * w.n + j, non_planar)
+    return segments[~mask], segments[mask]
@@ -1,16 +1,25 @@
-import mapclassify as classify
+import copy
+import functools
+import hashlib
+import os
+import threading
+import warnings
+import weakref
+from collections import OrderedDict
+
 import matplotlib
 import matplotlib as mpl
 import numpy as np
 from packaging.version import Version
 
+from ._fit import fit_line
+
 # isolate MPL version - GH#162
 MPL_36 = Version(matplotlib.__version__) >= Version("3.6")
 if MPL_36:
     from matplotlib import colormaps as cm
 else:
     import matplotlib.cm as cm
-    import matplotlib.pyplot as plt
 
 
 """
@@ -20,14 +29,263 @@ Utility functions for lightweight visualizations in splot
 __author__ = "Stefanie Lumnitz <stefanie.lumitz@gmail.com>"
 
 
+class _LRUCache:
+    """
+    Bounded least-recently-used cache.
+
+    Entries can be tied to an ``owner`` object (e.g. an esda statistic).
+    These are keyed by the owner's identity, checked against a weak
+    reference on lookup and dropped as soon as the owner is garbage
+    collected, so a recycled ``id()`` can never return stale data.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of entries kept before the least recently
+        used entry is evicted. Default =16.
+    maxbytes : int, optional
+        If given, least recently used entries are also evicted while
+        the cached values take more than `maxbytes`, as measured by
+        `sizeof`. Larger values are returned without being cached.
+        Default =None.
+    sizeof : callable, optional
+        Size of a value in bytes, used with `maxbytes`. Default =None.
+    """
+
+    def __init__(self, maxsize=16, maxbytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def _discard(self, key, ref):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is ref:
+                del self._entries[key]
+                self.nbytes -= entry[2]
+
+    def get(self, key, compute, owner=None):
+        """
+        Return the value cached under `key`, calling `compute()`
+        and storing its result on a miss.
+        """
+        if owner is not None:
+            key = (id(owner),) + tuple(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0]() is owner):
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        value = compute()
+        size = 0 if self.maxbytes is None else self.sizeof(value)
+        if self.maxbytes is not None and size > self.maxbytes:
+            return value
+        if owner is None:
+            ref = None
+        else:
+            try:
+                ref = weakref.ref(owner, lambda r, key=key: self._discard(key, r))
+            except TypeError:
+                # objects without weakref support are not cached
+                return value
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[2]
+            self._entries[key] = (ref, value, size)
+            self.nbytes += size
+            while len(self._entries) > self.maxsize or (
+                self.maxbytes is not None and self.nbytes > self.maxbytes
+            ):
+                self.nbytes -= self._entries.popitem(last=False)[1][2]
+        return value
+
+
+def _array_nbytes(value):
+    # bytes of the arrays held by an object, e.g. a mapclassify classifier
+    return sum(v.nbytes for v in vars(value).values() if isinstance(v, np.ndarray))
+
+
+# derived data (spatial lag, fit, hot/cold spots) of esda statistics,
+# shared by all Moran plots so restyling a plot does not recompute them
+_stat_cache = _LRUCache(maxsize=16)
+
+# simplified geometries per geometry array and tolerance
+_geometry_cache = _LRUCache(maxsize=8)
+
+# mapclassify results per digest of the classified values and parameters,
+# bounded in bytes as each result holds its own values and bin ids
+_classification_cache = _LRUCache(
+    maxsize=32, maxbytes=512 * 2**20, sizeof=_array_nbytes
+)
+
+
+def _readonly(array):
+    # cached arrays are shared between callers, guard against mutation
+    array = np.asarray(array)
+    array.setflags(write=False)
+    return array
+
+
+def _moran_scatter_values(moran, zstandard=True):
+    """
+    Attribute and spatial lag values shown in a Moran Scatterplot.
+
+    Bivariate statistics always use the standardized ``zx`` and the
+    spatial lag of ``zy``. Results are cached per statistic.
+    """
+    bivariate = hasattr(moran, "zx")
+    zstandard = bool(zstandard) or bivariate
+
+    def _calc():
+        from libpysal.weights.spatial_lag import lag_spatial
+
+        if bivariate:
+            x, y = moran.zx, moran.zy
+        elif zstandard:
+            x = y = moran.z
+        else:
+            x = y = moran.y
+        return x, _readonly(lag_spatial(moran.w, y))
+
+    key = ("lag", zstandard, moran.w.transform)
+    return _stat_cache.get(key, _calc, owner=moran)
+
+
+def _moran_fit(moran, zstandard=True, method="closed_form"):
+    """
+    Fit of the spatial lag on the attribute values of a Moran Scatterplot,
+    see `splot._fit.fit_line`. Results are cached per statistic.
+    """
+    x, lag = _moran_scatter_values(moran, zstandard)
+    key = ("fit", bool(zstandard) or hasattr(moran, "zx"), moran.w.transform, method)
+    return _stat_cache.get(key, lambda: fit_line(x, lag, method), owner=moran)
+
+
+def _moran_spots(moran_loc, p):
+    """
+    Cached version of `moran_hot_cold_spots`, as int8 codes.
+    """
+    return _moran_spots_multi(moran_loc, [p])[0]
+
+
+def _moran_spots_multi(moran_loc, ps):
+    """
+    Cached version of `moran_hot_cold_spots_multi`, as a list of int8
+    codes per threshold. Codes are cached per threshold, thresholds
+    missing from the cache are classified together in one call.
+    """
+    ps = np.ravel(ps).tolist()
+    computed = {}
+
+    def _calc(i):
+        if i not in computed:
+            # first miss, classify this and all following thresholds
+            codes = moran_hot_cold_spots_multi(moran_loc, ps[i:])
+            computed.update(zip(range(i, len(ps)), codes))
+        return _readonly(computed[i])
+
+    return [
+        _stat_cache.get(("spots", p), lambda i=i: _calc(i), owner=moran_loc)
+        for i, p in enumerate(ps)
+    ]
+
+
 def moran_hot_cold_spots(moran_loc, p=0.05):
-    sig = 1 * (moran_loc.p_sim < p)
-    HH = 1 * (sig * moran_loc.q == 1)
-    LL = 3 * (sig * moran_loc.q == 3)
-    LH = 2 * (sig * moran_loc.q == 2)
-    HL = 4 * (sig * moran_loc.q == 4)
-    cluster = HH + LL + LH + HL
-    return cluster
+    # significant observations take the code of their quadrant
+    return np.where(moran_loc.p_sim < p, moran_loc.q, 0)
+
+
+def moran_hot_cold_spots_multi(moran_loc, ps):
+    """
+    Hot and cold spot codes of a local statistic for several
+    significance thresholds at once
+
+    Parameters
+    ----------
+    moran_loc : esda.moran.Moran_Local or Moran_Local_BV instance
+        Values of Moran's Local Autocorrelation Statistic.
+    ps : array
+        (k,), p-value thresholds for significance.
+
+    Returns
+    -------
+    codes : ndarray
+        (k, n), int8 codes of each observation for each threshold,
+        0 if not significant, otherwise the Moran Scatterplot quadrant
+        1 (HH), 2 (LH), 3 (LL) or 4 (HL), as `moran_hot_cold_spots`.
+    """
+    p_sim = np.asarray(moran_loc.p_sim)
+    significant = p_sim < np.ravel(ps)[:, np.newaxis]
+    q = np.asarray(moran_loc.q, dtype=np.int8)
+    return np.where(significant, q, np.int8(0))
+
+
+def _moran_sample(moran, max_points, p=None, zstandard=True):
+    """
+    Indices of the points drawn in a Moran Scatterplot of at most
+    `max_points` points, or None if all points are drawn.
+
+    If `p` is given, all hot and cold spots of the local statistic are
+    kept, with a warning if there are more than `max_points` of them.
+    The remaining points are drawn reproducibly from the other
+    observations, stratified by scatterplot quadrant so that every
+    quadrant keeps its share. Results are cached per statistic.
+    """
+    x, lag = _moran_scatter_values(moran, zstandard)
+    n = len(x)
+    if max_points is None or n <= max_points:
+        return None
+
+    def _calc():
+        if p is None:
+            keep = np.zeros(n, dtype=bool)
+        else:
+            keep = _moran_spots(moran, p) != 0
+        rest = np.flatnonzero(~keep)
+        budget = min(max(max_points - keep.sum(), 0), len(rest))
+        # quadrants around the means, 0 (HH), 1 (LH), 2 (HL) and 3 (LL)
+        quadrant = (x[rest] < x.mean()) + 2 * (lag[rest] < lag.mean())
+        counts = np.bincount(quadrant, minlength=4)
+        # shares of the budget, rounding up the largest remainders
+        quota = counts * (budget / max(len(rest), 1))
+        alloc = np.floor(quota).astype(int)
+        alloc[np.argsort(alloc - quota)[: budget - alloc.sum()]] += 1
+        # a random subset of each quadrant from random keys sorted by quadrant
+        rng = np.random.default_rng(0)
+        order = np.lexsort((rng.random(len(rest)), quadrant))
+        rank = np.arange(len(rest)) - np.repeat(np.cumsum(counts) - counts, counts)
+        drawn = rest[order[rank < alloc[quadrant[order]]]]
+        return _readonly(np.sort(np.concatenate([np.flatnonzero(keep), drawn])))
+
+    key = ("sample", max_points, p, bool(zstandard) or hasattr(moran, "zx"))
+    sample = _stat_cache.get(key, _calc, owner=moran)
+    if len(sample) > max_points:
+        warnings.warn(
+            "All {} hot and cold spots are drawn, more than max_points={}".format(
+                len(sample), max_points
+            )
+        )
+    return sample
+
+
+def _sampled_title(title, sample, n):
+    # report the share of drawn points of a downsampled scatterplot
+    if sample is None:
+        return title
+    return "{} ({:.1%} of points)".format(title, len(sample) / n)
 
 
 def mask_local_auto(moran_loc, p=0.5):
@@ -55,48 +313,265 @@ def mask_local_auto(moran_loc, p=0.5):
         List of label for each attribute value/ polygon.
     """
     # create a mask for local spatial autocorrelation
-    cluster = moran_hot_cold_spots(moran_loc, p)
+    return _cluster_mask(_moran_spots(moran_loc, p))
 
-    cluster_labels = ["ns", "HH", "LH", "LL", "HL"]
-    labels = [cluster_labels[i] for i in cluster]
 
-    colors5 = {0: "lightgrey", 1: "#d7191c", 2: "#abd9e9", 3: "#2c7bb6", 4: "#fdae61"}
-    colors = [colors5[i] for i in cluster]  # for Bokeh
+# names and colours of hot and cold spot codes, indexed by code
+_cluster_names = np.array(["ns", "HH", "LH", "LL", "HL"], dtype=object)
+_cluster_colors = np.array(
+    ["lightgrey", "#d7191c", "#abd9e9", "#2c7bb6", "#fdae61"], dtype=object
+)
+
+
+def _cluster_mask(cluster):
+    """
+    Labels and colours of hot and cold spot codes, as returned by
+    `mask_local_auto`.
+    """
+    cluster = np.asarray(cluster)
+    labels = _cluster_names[cluster].tolist()
+    colors = _cluster_colors[cluster].tolist()  # for Bokeh
     # for MPL, keeps colors even if clusters are missing:
-    x = np.array(labels)
-    y = np.unique(x)
-    colors5_mpl = {
-        "HH": "#d7191c",
-        "LH": "#abd9e9",
-        "LL": "#2c7bb6",
-        "HL": "#fdae61",
-        "ns": "lightgrey",
-    }
-    colors5 = [colors5_mpl[i] for i in y]  # for mpl
+    _, colors5 = _cluster_categorical(cluster)
 
     # HACK need this, because MPL sorts these labels while Bokeh does not
-    cluster_labels.sort()
+    cluster_labels = sorted(_cluster_names)
     return cluster_labels, colors5, colors, labels
 
 
+def _cluster_categorical(cluster):
+    """
+    Hot and cold spot codes as a pandas Categorical, without converting
+    them to one label per observation.
+
+    Categories are the names of the codes present in `cluster`, sorted
+    alphabetically as in the legends of LISA cluster maps, and are
+    returned together with their colours.
+    """
+    import pandas as pd
+
+    cluster = np.asarray(cluster)
+    present = np.flatnonzero(np.bincount(cluster, minlength=len(_cluster_names)))
+    present = present[np.argsort(_cluster_names[present])]
+    position = np.zeros(len(_cluster_names), dtype=np.int8)
+    position[present] = np.arange(len(present))
+    categorical = pd.Categorical.from_codes(
+        position[cluster], categories=_cluster_names[present]
+    )
+    return categorical, _cluster_colors[present].tolist()
+
+
+# mapclassify classifiers by scheme name, only imported when used
 _classifiers = {
-    "box_plot": classify.BoxPlot,
-    "equal_interval": classify.EqualInterval,
-    "fisher_jenks": classify.FisherJenks,
-    "headtail_breaks": classify.HeadTailBreaks,
-    "jenks_caspall": classify.JenksCaspall,
-    "jenks_caspall_forced": classify.JenksCaspallForced,
-    "max_p_classifier": classify.MaxP,
-    "maximum_breaks": classify.MaximumBreaks,
-    "natural_breaks": classify.NaturalBreaks,
-    "quantiles": classify.Quantiles,
-    "percentiles": classify.Percentiles,
-    "std_mean": classify.StdMean,
-    "user_defined": classify.UserDefined,
+    "box_plot": "BoxPlot",
+    "equal_interval": "EqualInterval",
+    "fisher_jenks": "FisherJenks",
+    "headtail_breaks": "HeadTailBreaks",
+    "jenks_caspall": "JenksCaspall",
+    "jenks_caspall_forced": "JenksCaspallForced",
+    "max_p_classifier": "MaxP",
+    "maximum_breaks": "MaximumBreaks",
+    "natural_breaks": "NaturalBreaks",
+    "quantiles": "Quantiles",
+    "percentiles": "Percentiles",
+    "std_mean": "StdMean",
+    "user_defined": "UserDefined",
 }
 
 
-def bin_values_choropleth(attribute_values, method="quantiles", k=5):
+def _classifier(scheme):
+    """
+    Return the `mapclassify` classifier class for `scheme`.
+    """
+    import mapclassify
+
+    return getattr(mapclassify, _classifiers[scheme])
+
+
+def _hashable(value):
+    # list and array parameters (e.g. pct, bins) as part of a cache key
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(np.asarray(value).ravel().tolist())
+    return value
+
+
+# schemes whose breaks are quantiles or optimal partitions of the values,
+# which a sample estimates; fixed or range based breaks are not sampled
+_sampled_schemes = (
+    "box_plot",
+    "fisher_jenks",
+    "jenks_caspall",
+    "natural_breaks",
+    "percentiles",
+    "quantiles",
+)
+
+
+def _check_sampled_scheme(scheme):
+    if scheme not in _sampled_schemes:
+        raise ValueError(
+            "Breaks of scheme {} cannot be estimated from a sample, "
+            "sampling supports {}".format(scheme, ", ".join(_sampled_schemes))
+        )
+
+
+def _sample_breaks(scheme, sample, args, y_max):
+    """
+    Upper bounds of the classes of `scheme` estimated from `sample`,
+    the last one raised to `y_max`, the maximum of all values.
+    """
+    bins = np.asarray(_classifier(scheme)(sample, *args).bins, dtype=float)
+    bins = bins.copy()
+    bins[-1] = max(bins[-1], y_max)
+    return bins
+
+
+def _user_defined(y, bins, sample_size):
+    """
+    `mapclassify.UserDefined` classification of `y` into the classes of
+    breaks estimated from a sample of `sample_size` values, so that all
+    statistics of the classifier describe `y`.
+    """
+    classification = _classifier("user_defined")(y, bins)
+    classification.sample_size = sample_size
+    return classification
+
+
+def _sampled_classification(scheme, y, args, sample, sampling="random"):
+    """
+    Estimate the breaks of `scheme` from a sample of `sample` values of
+    `y` and assign all values of `y` to these classes.
+
+    The sample is drawn reproducibly, either at random or, with
+    ``sampling='stratified'``, as one random value from each of
+    `sample` equally sized strata of the sorted values. The upper bound
+    of the last class is set to the maximum of `y`, so that every value
+    is assigned. The returned classifier is a `mapclassify.UserDefined`
+    of `y` with these breaks and has a `sample_size` attribute.
+    """
+    rng = np.random.default_rng(0)
+    n = len(y)
+    if sampling == "random":
+        subset = y[rng.choice(n, size=sample, replace=False)]
+    else:
+        offsets = (np.arange(sample) + rng.random(sample)) * (n / sample)
+        subset = np.sort(y)[offsets.astype(int)]
+
+    bins = _sample_breaks(scheme, subset, args, y.max())
+    return _user_defined(y, bins, sample)
+
+
+def _classify(scheme, y, *args, sample=None, sampling="random"):
+    """
+    Classify `y` with the `mapclassify` classifier of `scheme`.
+
+    Results are cached by a digest of the values together with the
+    scheme and the positional classifier parameters, so classifying the
+    same variable again reuses its breaks. Every call returns a shallow
+    copy of the cached classifier whose arrays are shared read-only
+    views, so cache hits do not copy the values. If `sample` is given
+    and smaller than the number of values, breaks are estimated from a
+    sample, see `_sampled_classification`.
+    """
+    if sampling not in ("random", "stratified"):
+        raise ValueError("Sampling {} not supported".format(sampling))
+    values = np.asarray(y)
+    sampled = sample is not None and sample < values.size
+    if sampled:
+        _check_sampled_scheme(scheme)
+
+    def _calc():
+        if sampled:
+            return _sampled_classification(
+                scheme, values.ravel(), args, sample, sampling
+            )
+        return _classifier(scheme)(y, *args)
+
+    if values.dtype.hasobject:
+        return _calc()
+
+    def _calc_shared():
+        classification = _calc()
+        for name, value in vars(classification).items():
+            if isinstance(value, np.ndarray):
+                setattr(classification, name, _readonly(value.view()))
+        return classification
+
+    # hash the buffer of the values, contiguous arrays are not copied
+    buffer = np.ascontiguousarray(values).reshape(-1).view(np.uint8)
+    digest = hashlib.blake2b(buffer, digest_size=16).hexdigest()
+    key = (scheme, digest, values.dtype.str, values.shape)
+    key += tuple(_hashable(arg) for arg in args)
+    if sampled:
+        key += ("sample", sample, sampling)
+    return copy.copy(_classification_cache.get(key, _calc_shared))
+
+
+def _iter_chunks(source, chunksize=1000000):
+    """
+    Iterate over the blocks of a chunked attribute column.
+
+    `source` is an array or memory-mapped array, read in slices of
+    `chunksize` values, the path of a ``.npy`` file, which is memory
+    mapped, or a callable returning a new iterable of array blocks on
+    every call. Sources are traversed more than once, so plain
+    iterators are not accepted.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        source = np.load(source, mmap_mode="r")
+    if callable(source):
+        source = source()
+    elif iter(source) is source:
+        raise TypeError(
+            "Iterators can only be traversed once, pass a callable "
+            "returning a new iterator instead."
+        )
+    if isinstance(source, np.ndarray):
+        starts = range(0, len(source), chunksize)
+        return (np.asarray(source[slice(i, i + chunksize)]) for i in starts)
+    return (np.asarray(block) for block in source)
+
+
+def _chunked_min_max(source, chunksize=1000000):
+    """
+    Minimum and maximum of a chunked attribute column.
+    """
+    minimum, maximum = np.inf, -np.inf
+    for chunk in _iter_chunks(source, chunksize):
+        if chunk.size:
+            minimum = min(minimum, chunk.min())
+            maximum = max(maximum, chunk.max())
+    return minimum, maximum
+
+
+def _chunked_sample(source, size, chunksize=1000000):
+    """
+    Reproducible random sample of up to `size` values of a chunked
+    attribute column, together with its maximum and number of values.
+
+    Every value gets a random key and the values with the `size`
+    smallest keys are kept, so only the sample is held in memory.
+    """
+    rng = np.random.default_rng(0)
+    keys, sample = np.empty(0), np.empty(0)
+    maximum, count = -np.inf, 0
+    for chunk in _iter_chunks(source, chunksize):
+        chunk = chunk.ravel()
+        if not chunk.size:
+            continue
+        maximum = max(maximum, chunk.max())
+        count += chunk.size
+        keys = np.concatenate((keys, rng.random(chunk.size)))
+        sample = np.concatenate((sample, chunk))
+        if keys.size > size:
+            keep = np.argpartition(keys, size - 1)[:size]
+            keys, sample = keys[keep], sample[keep]
+    return sample, maximum, count
+
+
+def bin_values_choropleth(
+    attribute_values, method="quantiles", k=5, sample=None, sampling="random"
+):
     """
     Create bins based on different classification methods.
     Needed for legend labels and Choropleth coloring.
@@ -112,6 +587,15 @@ def bin_values_choropleth(attribute_values, method="quantiles", k=5):
         * 'equal-interval'
     k : int
         Number of bins, assigning values to. Default k=5
+    sample : int, optional
+        If given and smaller than the number of values, bins are estimated
+        from a reproducible sample of this size and all values are then
+        assigned to them with `mapclassify.UserDefined`. Supported by
+        'quantiles' and 'fisher_jenks'. Default =None, all values are
+        classified.
+    sampling : str, optional
+        How the sample is drawn, 'random' or 'stratified' by the sorted
+        values. Default ='random'.
 
     Returns
     -------
@@ -123,10 +607,31 @@ def bin_values_choropleth(attribute_values, method="quantiles", k=5):
     if method not in ["quantiles", "fisher_jenks", "equal_interval"]:
         raise ValueError("Method {} not supported".format(method))
 
-    bin_values = _classifiers[method](attribute_values, k)
+    bin_values = _classify(
+        method, attribute_values, k, sample=sample, sampling=sampling
+    )
     return bin_values
 
 
+def _choropleth_labels(attribute_values, method="quantiles", k=5):
+    """
+    Create legend labels for each bin and the bin id of each observation.
+
+    Returns
+    -------
+    bin_labels : list of str
+        List of label for each bin.
+    yb : ndarray
+        (n,), bin id of each observation, indexing `bin_labels`.
+    """
+    # Retrieve bin values from bin_values_choropleth()
+    bin_values = bin_values_choropleth(attribute_values, method=method, k=k)
+
+    # Create bin labels (smaller version) from the upper bounds of each class
+    bin_labels = ["<{:1.1f}".format(edge) for edge in bin_values.bins.tolist()[:k]]
+    return bin_labels, np.asarray(bin_values.yb)
+
+
 def bin_labels_choropleth(gdf, attribute_values, method="quantiles", k=5):
     """
     Create labels for each bin in the legend
@@ -135,6 +640,7 @@ def bin_labels_choropleth(gdf, attribute_values, method="quantiles", k=5):
     ----------
     gdf : Geopandas dataframe
         Dataframe containign relevant shapes and attribute values.
+        The label of each row is assigned to ``gdf['labels_choro']``.
     attribute_values : array or geopandas.series instance
         Array containing relevant attribute values.
     method : str, optional
@@ -150,22 +656,9 @@ def bin_labels_choropleth(gdf, attribute_values, method="quantiles", k=5):
     bin_labels : list of str
         List of label for each bin.
     """
-    # Retrieve bin values from bin_values_choropleth()
-    bin_values = bin_values_choropleth(attribute_values, method=method, k=k)
-
-    # Extract bin ids (.yb) and upper bounds for each class (.bins)
-    yb = bin_values.yb
-    bins = bin_values.bins
-
-    # Create bin labels (smaller version)
-    bin_edges = bins.tolist()
-    bin_labels = []
-    for i in range(k):
-        bin_labels.append("<{:1.1f}".format(bin_edges[i]))
-
+    bin_labels, yb = _choropleth_labels(attribute_values, method, k)
     # Add labels (which are the labels printed in the legend) to each row of gdf
-    labels = np.array([bin_labels[c] for c in yb])
-    gdf["labels_choro"] = [str(l_) for l_ in labels]
+    gdf["labels_choro"] = np.array(bin_labels, dtype=object)[yb]
     return bin_labels
 
 
@@ -247,6 +740,146 @@ def calc_data_aspect(plot_height, plot_width, bounds):
     return xmin, xmax, ymin, ymax
 
 
+def _simplify_tolerance(bounds, plot_width, plot_height):
+    """
+    Size of a pixel in data units for a map of `bounds` drawn on a
+    `plot_width` x `plot_height` pixel canvas with equal aspect.
+    """
+    xmin, xmax, _, _ = calc_data_aspect(plot_height, plot_width, bounds)
+    return (xmax - xmin) / plot_width
+
+
+def _simplified_gdf(gdf, simplify=False, plot_width=500, plot_height=500):
+    """
+    Level-of-detail stage shared by the map renderers.
+
+    Parameters
+    ----------
+    gdf : geopandas dataframe
+        The Dataframe containing the geometries to draw.
+    simplify : bool or float, optional
+        If True, geometries are simplified to the size of a pixel of
+        the map. A float sets the simplification tolerance in the units
+        of the geometries. Default =False, so `gdf` is returned as is.
+    plot_width, plot_height : float, optional
+        Dimensions of the map in pixels. Default =500.
+
+    Returns
+    -------
+    gdf : geopandas dataframe
+        `gdf` with simplified geometries. Results are cached per
+        geometry array and tolerance.
+    """
+    if simplify is None or simplify is False:
+        return gdf
+    if simplify is True:
+        tolerance = _simplify_tolerance(gdf.total_bounds, plot_width, plot_height)
+    else:
+        tolerance = float(simplify)
+    geometry = gdf.geometry
+    simplified = _geometry_cache.get(
+        ("simplify", tolerance),
+        lambda: geometry.values.simplify(tolerance),
+        owner=geometry.values,
+    )
+    return gdf.set_geometry(geometry.__class__(simplified, index=gdf.index))
+
+
+def _polygon_xs_ys(geometry):
+    """
+    Explode polygon geometries into flat coordinate arrays.
+
+    Parameters
+    ----------
+    geometry : geopandas GeoSeries or array of shapely Polygons
+        (n,), polygon or multi-polygon geometries.
+
+    Returns
+    -------
+    xs, ys : list of ndarray
+        (n,), x and y coordinates of the exterior ring of each geometry.
+        Parts of multi-polygons are separated by NaN, as expected by
+        Bokeh's `patches` glyph.
+    """
+    import shapely
+
+    geoms = np.asarray(geometry)
+    if len(geoms) == 0:
+        return [], []
+    parts, part_geom = shapely.get_parts(geoms, return_index=True)
+    coords, coord_part = shapely.get_coordinates(
+        shapely.get_exterior_ring(parts), return_index=True
+    )
+    n_parts = len(parts)
+    # every part is followed by a NaN row, the trailing one of each
+    # geometry is dropped when splitting the flat array by geometry
+    flat = np.full((len(coords) + n_parts, 2), np.nan)
+    flat[np.arange(len(coords)) + coord_part] = coords
+    part_sizes = np.bincount(coord_part, minlength=n_parts) + 1
+    geom_sizes = np.bincount(part_geom, weights=part_sizes, minlength=len(geoms))
+    splits = np.cumsum(geom_sizes).astype(int)[:-1]
+    xs = [x[:-1] for x in np.split(flat[:, 0], splits)]
+    ys = [y[:-1] for y in np.split(flat[:, 1], splits)]
+    return xs, ys
+
+
+def _geometry_paths(geometry):
+    """
+    One matplotlib Path per geometry.
+
+    Parameters
+    ----------
+    geometry : geopandas GeoSeries or array of shapely geometries
+        (n,), polygon, multi-polygon, line or multi-line geometries.
+
+    Returns
+    -------
+    paths : list of matplotlib.path.Path
+        (n,), compound path of all parts of each geometry. Polygon rings,
+        exteriors and holes alike, are closed, so the paths can be drawn
+        with a single PathCollection whose i-th face is the i-th geometry.
+    """
+    import shapely
+    from matplotlib.path import Path
+
+    geoms = np.asarray(geometry)
+    if len(geoms) == 0:
+        return []
+    parts, part_geom = shapely.get_parts(geoms, return_index=True)
+    polygon = shapely.get_type_id(parts) == 3
+    # holes wind against their exterior, as matplotlib fills by winding number
+    if hasattr(shapely, "orient_polygons"):
+        parts[polygon] = shapely.orient_polygons(parts[polygon])
+    else:
+        from shapely.geometry.polygon import orient
+
+        parts[polygon] = [orient(part) for part in parts[polygon]]
+    # rings of polygons, lines are used as they are
+    rings, ring_part = shapely.get_rings(parts, return_index=True)
+    lines = np.flatnonzero(~polygon)
+    rings = np.concatenate([rings, parts[lines]])
+    ring_part = np.concatenate([ring_part, lines])
+    coords, coord_ring = shapely.get_coordinates(rings, return_index=True)
+    # keep the rings of each geometry together and in order
+    order = np.argsort(part_geom[ring_part][coord_ring], kind="stable")
+    coords, coord_ring = coords[order], coord_ring[order]
+
+    codes = np.full(len(coords), Path.LINETO, dtype=Path.code_type)
+    first = np.r_[True, coord_ring[1:] != coord_ring[:-1]]
+    last = np.r_[first[1:], True]
+    codes[first] = Path.MOVETO
+    codes[last & polygon[ring_part][coord_ring]] = Path.CLOSEPOLY
+
+    sizes = np.bincount(part_geom[ring_part][coord_ring], minlength=len(geoms))
+    splits = np.cumsum(sizes)[:-1]
+    return [
+        Path(vertices, path_codes)
+        for vertices, path_codes in zip(
+            np.split(coords, splits), np.split(codes, splits)
+        )
+    ]
+
+
 # Utility functions for colormaps
 # Color design
 splot_colors = dict(moran_base="#bababa", moran_fit="#d6604d")
@@ -280,17 +913,24 @@ def shift_colormap(  # noqa E302
         Should be between `midpoint` and 1.0.
         Default =1.0 (no upper ofset).
     name : str, optional
-        Name of the new colormap.
+        Name of the new colormap. It is not registered with matplotlib.
 
     Returns
     -------
     new_cmap : A new colormap that has been shifted.
     """
     if isinstance(cmap, str):
-        cmap = cm.get_cmap(cmap)
+        return _shifted_colormap(cmap, start, midpoint, stop, name).copy()
+    return _shift_colormap(cmap, start, midpoint, stop, name)
+
 
-    cdict = {"red": [], "green": [], "blue": [], "alpha": []}
+@functools.lru_cache(maxsize=128)
+def _shifted_colormap(cmap, start, midpoint, stop, name):
+    # colormaps by name are cached, callers receive a copy
+    return _shift_colormap(cm.get_cmap(cmap), start, midpoint, stop, name)
 
+
+def _shift_colormap(cmap, start, midpoint, stop, name):
     # regular index to compute the colors
     reg_index = np.linspace(start, stop, 257)
 
@@ -301,27 +941,9 @@ def shift_colormap(  # noqa E302
             np.linspace(midpoint, 1.0, 129, endpoint=True),
         ]
     )
-
-    for ri, si in zip(reg_index, shift_index):
-        r, g, b, a = cmap(ri)
-
-        cdict["red"].append((si, r, r))
-        cdict["green"].append((si, g, g))
-        cdict["blue"].append((si, b, b))
-        cdict["alpha"].append((si, a, a))
-
-    """
-    new_cmap = mpl.colors.LinearSegmentedColormap(name, cdict)
-    plt.register_cmap(cmap=new_cmap)
-    return new_cmap
-    """
-
-    new_cmap = mpl.colors.LinearSegmentedColormap(name, cdict)
-    if MPL_36:
-        cm.register(new_cmap)
-    else:
-        plt.register_cmap(cmap=new_cmap)
-    return new_cmap
+    return mpl.colors.LinearSegmentedColormap.from_list(
+        name, list(zip(shift_index, cmap(reg_index)))
+    )
 
 
 # Utility #2 - truncate colorcap in order to grab only positive or negative portion
@@ -349,10 +971,18 @@ def truncate_colormap(cmap, minval=0.0, maxval=1.0, n=100):
     """
 
     if isinstance(cmap, str):
-        cmap = cm.get_cmap(cmap)
+        return _truncated_colormap(cmap, minval, maxval, n).copy()
+    return _truncate_colormap(cmap, minval, maxval, n)
+
+
+@functools.lru_cache(maxsize=128)
+def _truncated_colormap(cmap, minval, maxval, n):
+    # colormaps by name are cached, callers receive a copy
+    return _truncate_colormap(cm.get_cmap(cmap), minval, maxval, n)
+
 
-    new_cmap = mpl.colors.LinearSegmentedColormap.from_list(
+def _truncate_colormap(cmap, minval, maxval, n):
+    return mpl.colors.LinearSegmentedColormap.from_list(
         "trunc({n},{a:.2f},{b:.2f})".format(n=cmap.name, a=minval, b=maxval),
         cmap(np.linspace(minval, maxval, n)),
     )
-    return new_cmap
@@ -3,10 +3,23 @@ import collections.abc
 import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib import colors, patches
+from matplotlib import colors
 from packaging.version import Version
 
-from ._viz_utils import _classifiers, format_legend
+from ._raster import raster_plot
+from ._viz_utils import (
+    _check_sampled_scheme,
+    _chunked_min_max,
+    _chunked_sample,
+    _classifier,
+    _classifiers,
+    _classify,
+    _iter_chunks,
+    _sample_breaks,
+    _simplified_gdf,
+    _user_defined,
+    format_legend,
+)
 
 # isolate MPL version - GH#162
 MPL_36 = Version(matplotlib.__version__) >= Version("3.6")
@@ -95,22 +108,124 @@ def value_by_alpha_cmap(x, y, cmap="GnBu", revert_alpha=False, divergent=False):
     >>> rev_rgba, _  = value_by_alpha_cmap(x, y, cmap='RdBu', revert_alpha=True)
 
     """
+    cmap = _vba_colormap(cmap)
+    rgba = _vba_rgba(
+        x,
+        y,
+        cmap,
+        (x.min(), x.max()),
+        (y.min(), y.max()),
+        revert_alpha=revert_alpha,
+        divergent=divergent,
+    )
+    return rgba, cmap
+
+
+def _vba_colormap(cmap):
     # option for cmap or colorlist input
     if isinstance(cmap, str):
         cmap = cm.get_cmap(cmap)
     elif isinstance(cmap, collections.abc.Sequence):
         cmap = colors.LinearSegmentedColormap.from_list("newmap", cmap)
+    return cmap
+
 
-    rgba = cmap((x - x.min()) / (x.max() - x.min()))
+def _vba_rgba(x, y, cmap, x_range, y_range, revert_alpha=False, divergent=False):
+    """
+    Value by Alpha rgba values of `x` and `y`, normalized by the
+    (min, max) ranges `x_range` and `y_range` of all values.
+    """
+    (x_min, x_max), (y_min, y_max) = x_range, y_range
+    rgba = cmap((x - x_min) / (x_max - x_min))
     if revert_alpha:
-        rgba[:, 3] = 1 - ((y - y.min()) / (y.max() - y.min()))
+        rgba[:, 3] = 1 - ((y - y_min) / (y_max - y_min))
     else:
-        rgba[:, 3] = (y - y.min()) / (y.max() - y.min())
+        rgba[:, 3] = (y - y_min) / (y_max - y_min)
     if divergent is not False:
         a_under_0p5 = rgba[:, 3] < 0.5
         rgba[a_under_0p5, 3] = 1 - rgba[a_under_0p5, 3]
         rgba[:, 3] = (rgba[:, 3] - 0.5) * 2
-    return rgba, cmap
+    return rgba
+
+
+def value_by_alpha_cmap_chunks(
+    x, y, cmap="GnBu", revert_alpha=False, divergent=False, chunksize=1000000
+):
+    """
+    Calculates Value by Alpha rgba values chunk by chunk, for attribute
+    columns too large to be held in memory
+
+    A first pass over `x` and `y` computes their global minimum and
+    maximum, a second pass yields the rgba values of each chunk as
+    `value_by_alpha_cmap` would compute them for the full arrays.
+
+    Parameters
+    ----------
+    x : array, str or callable
+        Variable determined by color. An array or memory-mapped array,
+        read in chunks of `chunksize` values, the path of a ``.npy``
+        file, which is memory mapped, or a callable returning a new
+        iterable of array blocks on every call.
+    y : array, str or callable
+        Variable determining alpha value, with the same chunks as `x`.
+    cmap : str or list of str
+        Matplotlib Colormap or list of colors used
+        to create vba_layer
+    revert_alpha : bool, optional
+        If True, high y values will have a
+        low alpha and low values will be transparent.
+        Default =False.
+    divergent : bool, optional
+        Creates a divergent alpha array with high values
+        at the extremes and low, transparent values
+        in the middle of the input values.
+    chunksize : int, optional
+        Number of values per chunk read from arrays and ``.npy`` files.
+        Default =1000000.
+
+    Returns
+    -------
+    rgba : generator of ndarray
+        (m,4), RGBA values of each chunk.
+    cmap : str or list of str
+        Original Matplotlib Colormap or list of colors used
+        to create vba_layer
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from splot.mapping import value_by_alpha_cmap_chunks
+
+    Save two large columns, then colour them chunk by chunk
+
+    >>> np.save('x.npy', np.random.random(10000000))
+    >>> np.save('y.npy', np.random.random(10000000))
+    >>> rgba, _ = value_by_alpha_cmap_chunks('x.npy', 'y.npy')
+    >>> for chunk in rgba:
+    ...     pass
+
+    """
+    cmap = _vba_colormap(cmap)
+    x_range = _chunked_min_max(x, chunksize)
+    y_range = _chunked_min_max(y, chunksize)
+
+    def _rgba_chunks():
+        x_chunks = _iter_chunks(x, chunksize)
+        y_chunks = _iter_chunks(y, chunksize)
+        for x_chunk, y_chunk in zip(x_chunks, y_chunks):
+            if len(x_chunk) != len(y_chunk):
+                raise ValueError("Chunks of x and y differ in length.")
+            yield _vba_rgba(
+                x_chunk,
+                y_chunk,
+                cmap,
+                x_range,
+                y_range,
+                revert_alpha=revert_alpha,
+                divergent=divergent,
+            )
+
+    return _rgba_chunks(), cmap
 
 
 def vba_choropleth(
@@ -124,6 +239,8 @@ def vba_choropleth(
     rgb_mapclassify=None,
     ax=None,
     legend=False,
+    simplify=False,
+    raster=False,
 ):
     """
     Value by Alpha Choropleth
@@ -166,6 +283,16 @@ def vba_choropleth(
         Adds a legend.
         Note: currently only available if data is classified,
         hence if `alpha_mapclassify` and `rgb_mapclassify` are used.
+    simplify : bool or float, optional
+        If True, geometries are simplified to the pixel size of the map
+        before drawing. A float sets the simplification tolerance in the
+        units of the geometries. Default =False, so full resolution
+        geometries are drawn.
+    raster : bool, optional
+        If True, polygons are burned into a single image at the resolution
+        of the Axes instead of being drawn as one patch each, which is much
+        faster and lighter for maps with very many polygons.
+        Default =False.
 
     Returns
     -------
@@ -262,6 +389,8 @@ def vba_choropleth(
         rgb_mapclassify.setdefault("mindiff", 0)
         rgb_mapclassify.setdefault("initial", 100)
         rgb_mapclassify.setdefault("bins", [20, max(x)])
+        rgb_mapclassify.setdefault("sample", None)
+        rgb_mapclassify.setdefault("sampling", "random")
         classifier = rgb_mapclassify["classifier"]
         k = rgb_mapclassify["k"]
         hinge = rgb_mapclassify["hinge"]
@@ -269,6 +398,8 @@ def vba_choropleth(
         mindiff = rgb_mapclassify["mindiff"]
         initial = rgb_mapclassify["initial"]
         bins = rgb_mapclassify["bins"]
+        sample = rgb_mapclassify["sample"]
+        sampling = rgb_mapclassify["sampling"]
         rgb_bins = mapclassify_bin(
             x,
             classifier,
@@ -278,6 +409,8 @@ def vba_choropleth(
             mindiff=mindiff,
             initial=initial,
             bins=bins,
+            sample=sample,
+            sampling=sampling,
         )
         x = rgb_bins.yb
 
@@ -288,6 +421,8 @@ def vba_choropleth(
         alpha_mapclassify.setdefault("mindiff", 0)
         alpha_mapclassify.setdefault("initial", 100)
         alpha_mapclassify.setdefault("bins", [20, max(y)])
+        alpha_mapclassify.setdefault("sample", None)
+        alpha_mapclassify.setdefault("sampling", "random")
         classifier = alpha_mapclassify["classifier"]
         k = alpha_mapclassify["k"]
         hinge = alpha_mapclassify["hinge"]
@@ -295,6 +430,8 @@ def vba_choropleth(
         mindiff = alpha_mapclassify["mindiff"]
         initial = alpha_mapclassify["initial"]
         bins = alpha_mapclassify["bins"]
+        sample = alpha_mapclassify["sample"]
+        sampling = alpha_mapclassify["sampling"]
         # TODO: use the pct keyword here
         alpha_bins = mapclassify_bin(
             y,
@@ -305,13 +442,19 @@ def vba_choropleth(
             mindiff=mindiff,
             initial=initial,
             bins=bins,
+            sample=sample,
+            sampling=sampling,
         )
         y = alpha_bins.yb
 
     rgba, vba_cmap = value_by_alpha_cmap(
         x=x, y=y, cmap=cmap, divergent=divergent, revert_alpha=revert_alpha
     )
-    gdf.plot(color=rgba, ax=ax)
+    gdf = _simplified_gdf(gdf, simplify, ax.bbox.width, ax.bbox.height)
+    if raster:
+        raster_plot(gdf.geometry, rgba, ax)
+    else:
+        gdf.plot(color=rgba, ax=ax)
     ax.set_axis_off()
     ax.set_aspect("equal")
 
@@ -394,26 +537,26 @@ def vba_legend(rgb_bins, alpha_bins, cmap, ax=None):
     else:
         fig = ax.get_figure()
 
-    for irow, alpha_val in enumerate(alpha_vals):
-        for icol, rgb_val in enumerate(rgb_vals):
-            rect = patches.Rectangle(
-                (irow, icol),
-                1,
-                1,
-                linewidth=3,
-                edgecolor="none",
-                facecolor=rgb_val,
-                alpha=alpha_val,
-            )
-            ax.add_patch(rect)
+    # one RGBA image, rgb classes as rows and alpha classes as columns
+    n_alpha, n_rgb = len(alpha_vals), len(rgb_vals)
+    image = np.empty((n_rgb, n_alpha, 4))
+    image[..., :3] = rgb_vals[:, np.newaxis]
+    image[..., 3] = alpha_vals
+    ax.imshow(
+        image,
+        extent=(0, n_alpha, 0, n_rgb),
+        origin="lower",
+        aspect="auto",
+        interpolation="nearest",
+    )
 
     values_alpha, x_in_thousand = format_legend(alpha_bins.bins)
     values_rgb, y_in_thousand = format_legend(rgb_bins.bins)
     ax.plot([], [])
-    ax.set_xlim([0, irow + 1])
-    ax.set_ylim([0, icol + 1])
-    ax.set_xticks(np.arange(irow + 1) + 0.5)
-    ax.set_yticks(np.arange(icol + 1) + 0.5)
+    ax.set_xlim([0, n_alpha])
+    ax.set_ylim([0, n_rgb])
+    ax.set_xticks(np.arange(n_alpha) + 0.5)
+    ax.set_yticks(np.arange(n_rgb) + 0.5)
     ax.set_xticklabels(
         ["< %1.1f" % val for val in values_alpha],
         rotation=30,
@@ -444,6 +587,8 @@ def mapclassify_bin(
     mindiff=0,
     initial=100,
     bins=None,
+    sample=None,
+    sampling="random",
 ):
     """
     Classify your data with `pysal.mapclassify`
@@ -480,13 +625,29 @@ def mapclassify_bin(
         (k,1), upper bounds of classes (have to be monotically
         increasing) if using `user_defined` classifier.
         Default =None, Example =[20, max(y)].
+    sample : int, optional
+        If given and smaller than the number of values, breaks are
+        estimated from a reproducible sample of this size, e.g. for
+        `natural_breaks` or `fisher_jenks` on millions of values, and
+        all values are then assigned to these classes. The upper bound
+        of the last class is the maximum of `y`, and the result is a
+        `mapclassify.UserDefined` of `y` with these breaks. Only
+        'quantiles', 'percentiles', 'box_plot', 'fisher_jenks',
+        'natural_breaks' and 'jenks_caspall' support sampling.
+        Default =None, all values are classified.
+    sampling : str, optional
+        How the sample is drawn, 'random' or 'stratified', which takes
+        one random value from each of `sample` equally sized strata of
+        the sorted values. Default ='random'.
 
     Returns
     -------
     bins : pysal.mapclassify instance
         Object containing bin ids for each observation (.yb),
         upper bounds of each class (.bins), number of classes (.k)
-        and number of onservations falling in each class (.counts)
+        and number of onservations falling in each class (.counts).
+        If breaks were estimated from a sample, its size is stored in
+        (.sample_size).
 
     Note: Supported classifiers include: quantiles, box_plot, euqal_interval,
         fisher_jenks, headtail_breaks, jenks_caspall, jenks_caspall_forced,
@@ -518,24 +679,117 @@ def mapclassify_bin(
 
     """
     classifier = classifier.lower()
+    args = _mapclassify_args(
+        classifier, k, pct, hinge, multiples, mindiff, initial, bins
+    )
+    return _classify(classifier, y, *args, sample=sample, sampling=sampling)
+
+
+def _mapclassify_args(classifier, k, pct, hinge, multiples, mindiff, initial, bins):
+    """
+    Positional parameters of the `mapclassify` classifier of `classifier`.
+    """
     if classifier not in _classifiers:
         raise ValueError(
             "Invalid scheme. Scheme must be in the" " set: %r" % _classifiers.keys()
         )
     elif classifier == "box_plot":
-        bins = _classifiers[classifier](y, hinge)
+        args = (hinge,)
     elif classifier == "headtail_breaks":
-        bins = _classifiers[classifier](y)
+        args = ()
     elif classifier == "percentiles":
-        bins = _classifiers[classifier](y, pct)
+        args = (pct,)
     elif classifier == "std_mean":
-        bins = _classifiers[classifier](y, multiples)
+        args = (multiples,)
     elif classifier == "maximum_breaks":
-        bins = _classifiers[classifier](y, k, mindiff)
+        args = (k, mindiff)
     elif classifier in ["natural_breaks", "max_p_classifier"]:
-        bins = _classifiers[classifier](y, k, initial)
+        args = (k, initial)
     elif classifier == "user_defined":
-        bins = _classifiers[classifier](y, bins)
+        args = (bins,)
+    else:
+        args = (k,)
+    return args
+
+
+def mapclassify_bin_chunks(
+    y,
+    classifier,
+    k=5,
+    pct=[1, 10, 50, 90, 99, 100],
+    hinge=1.5,
+    multiples=[-2, -1, 1, 2],
+    mindiff=0,
+    initial=100,
+    bins=None,
+    sample=100000,
+    chunksize=1000000,
+):
+    """
+    Classify an attribute column too large to be held in memory
+    chunk by chunk with `pysal.mapclassify`
+
+    A first pass over `y` draws a reproducible random sample of `sample`
+    values, from which the breaks are estimated, a second pass assigns
+    the values of each chunk to these classes. The upper bound of the
+    last class is the maximum of `y`. Columns with at most `sample`
+    values are classified completely. Sampling supports the schemes
+    listed for `sample` in `mapclassify_bin`, breaks of 'user_defined'
+    are used as they are.
+    Note: Input parameters are dependent on classifier used.
+
+    Parameters
+    ----------
+    y : array, str or callable
+        Values to classify. An array or memory-mapped array, read in
+        chunks of `chunksize` values, the path of a ``.npy`` file,
+        which is memory mapped, or a callable returning a new iterable
+        of array blocks on every call.
+    classifier : str
+        pysal.mapclassify classification scheme, see `mapclassify_bin`.
+    k, pct, hinge, multiples, mindiff, initial, bins : optional
+        Parameters of the classifier, see `mapclassify_bin`.
+    sample : int, optional
+        Number of values the breaks are estimated from. Default =100000.
+    chunksize : int, optional
+        Number of values per chunk read from arrays and ``.npy`` files.
+        Default =1000000.
+
+    Returns
+    -------
+    bins : pysal.mapclassify instance
+        Classification of the sample, with the upper bounds of each
+        class (.bins), number of classes (.k) and, if the breaks were
+        estimated from a sample, its size (.sample_size). Sampled
+        breaks give a `mapclassify.UserDefined` of the sample.
+    yb : generator of ndarray
+        (m,), bin ids of the values of each chunk.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from splot.mapping import mapclassify_bin_chunks
+
+    >>> np.save('y.npy', np.random.lognormal(size=10000000))
+    >>> bins, yb = mapclassify_bin_chunks('y.npy', 'fisher_jenks', k=5)
+    >>> counts = sum(np.bincount(chunk, minlength=bins.k) for chunk in yb)
+
+    """
+    classifier = classifier.lower()
+    args = _mapclassify_args(
+        classifier, k, pct, hinge, multiples, mindiff, initial, bins
+    )
+    values, y_max, count = _chunked_sample(y, sample, chunksize)
+    if count <= len(values):
+        classification = _classifier(classifier)(values, *args)
     else:
-        bins = _classifiers[classifier](y, k)
-    return bins
+        # user defined breaks are not estimated, only the maximum is needed
+        if classifier != "user_defined":
+            _check_sampled_scheme(classifier)
+        bins = _sample_breaks(classifier, values, args, y_max)
+        classification = _user_defined(values, bins, len(values))
+    yb = (
+        np.searchsorted(classification.bins, chunk, side="left")
+        for chunk in _iter_chunks(y, chunksize)
+    )
+    return classification, yb
@@ -13,19 +13,25 @@ Moran analytics
    :toctree: generated/
 
    moran_scatterplot
+   moran_fit
    plot_moran_simulation
    plot_moran
    plot_moran_bv_simulation
    plot_moran_bv
    lisa_cluster
+   batch_lisa_cluster
    plot_local_autocorrelation
+   local_autocorrelation_explorer
    moran_facet
 
 """
 
 from ._viz_esda_mpl import (  # noqa F401
+    batch_lisa_cluster,
     lisa_cluster,
+    local_autocorrelation_explorer,
     moran_facet,
+    moran_fit,
     moran_scatterplot,
     plot_local_autocorrelation,
     plot_moran,
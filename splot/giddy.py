@@ -17,6 +17,7 @@ Directional LISA analytics
    dynamic_lisa_vectors
    dynamic_lisa_composite
    dynamic_lisa_composite_explore
+   dynamic_lisa_panel
 
 """
 
@@ -24,6 +25,7 @@ from ._viz_giddy_mpl import (  # noqa F401
     dynamic_lisa_composite,
     dynamic_lisa_composite_explore,
     dynamic_lisa_heatmap,
+    dynamic_lisa_panel,
     dynamic_lisa_rose,
     dynamic_lisa_vectors,
 )
@@ -16,6 +16,16 @@ Value-by-Alpha maps
    mapclassify_bin
 
 
+Out-of-core utilities
+---------------------
+
+.. autosummary::
+   :toctree: generated/
+
+   value_by_alpha_cmap_chunks
+   mapclassify_bin_chunks
+
+
 Colormap utilities
 ------------------
 
@@ -30,7 +40,9 @@ Colormap utilities
 from ._viz_utils import shift_colormap, truncate_colormap  # noqa F401
 from ._viz_value_by_alpha_mpl import (  # noqa F401
     mapclassify_bin,
+    mapclassify_bin_chunks,
     value_by_alpha_cmap,
+    value_by_alpha_cmap_chunks,
     vba_choropleth,
     vba_legend,
 )
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+
+class LocalStatistic:
+    """
+    Pseudo p-values and quadrants of a local statistic of six
+    observations, all that hot and cold spot codes are computed from.
+    """
+
+    def __init__(self):
+        self.p_sim = np.array([0.001, 0.02, 0.05, 0.2, 0.009, 0.05])
+        self.q = np.array([1, 2, 3, 4, 3, 1])
+
+
+@pytest.fixture
+def local_statistic():
+    # a new statistic per test, so cached codes are not shared
+    return LocalStatistic()
+
+
+@pytest.fixture
+def spy(monkeypatch):
+    """
+    Replace a module attribute by a function recording its calls.
+
+    ``spy(module, name, returns=None)`` returns the list of calls, each a
+    tuple of positional arguments and keywords. The replacement returns
+    ``returns(*args, **kwds)`` if given, otherwise it calls the original.
+    """
+
+    def _spy(module, name, returns=None):
+        calls = []
+        target = returns or getattr(module, name)
+
+        def _record(*args, **kwds):
+            calls.append((args, kwds))
+            return target(*args, **kwds)
+
+        monkeypatch.setattr(module, name, _record)
+        return calls
+
+    return _spy
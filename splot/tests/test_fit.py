@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from splot._fit import fit_line, fit_line_endpoints
+
+
+def test_fit_line():
+    rng = np.random.default_rng(12345)
+    x = rng.normal(size=200)
+    y = 0.5 + 2.0 * x + rng.normal(scale=0.1, size=200)
+
+    fit = fit_line(x, y)
+    slope, intercept = np.polyfit(x, y, 1)
+    np.testing.assert_allclose([fit.intercept, fit.slope], [intercept, slope])
+    assert fit.ols is None
+
+    fit_ols = fit_line(x, y, method="ols")
+    np.testing.assert_allclose(
+        [fit_ols.intercept, fit_ols.slope], [fit.intercept, fit.slope]
+    )
+    assert fit_ols.ols is not None
+
+    xs, ys = fit_line_endpoints(fit, x)
+    np.testing.assert_allclose(xs, [x.min(), x.max()])
+    np.testing.assert_allclose(ys, fit.intercept + fit.slope * xs)
+
+    pytest.raises(ValueError, fit_line, x, y, method="polyfit")
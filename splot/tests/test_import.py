@@ -0,0 +1,31 @@
+import subprocess
+import sys
+
+import pytest
+
+# heavy dependencies that are only imported by the functions needing them
+HEAVY_MODULES = [
+    "esda",
+    "geopandas",
+    "giddy",
+    "libpysal",
+    "mapclassify",
+    "seaborn",
+    "spreg",
+]
+
+
+@pytest.mark.parametrize(
+    "module", ["splot.esda", "splot.giddy", "splot.libpysal", "splot.mapping"]
+)
+def test_lazy_imports(module):
+    code = (
+        "import sys; import {}; "
+        "print(' '.join(m for m in {!r} if m in sys.modules))".format(
+            module, HEAVY_MODULES
+        )
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.split() == []
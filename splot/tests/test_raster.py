@@ -0,0 +1,34 @@
+import geopandas as gpd
+import matplotlib.pyplot as plt
+import numpy as np
+from libpysal import examples
+from shapely.geometry import MultiPolygon, Polygon, box
+
+from splot._raster import raster_plot, rasterize_polygons
+
+
+def test_rasterize_polygons():
+    holed = Polygon([(0, 0), (10, 0), (10, 10), (0, 10)], [box(2, 2, 8, 8).exterior])
+    image = rasterize_polygons([holed], ["red"], 10, 10, (0, 10, 0, 10))
+    assert image.shape == (10, 10, 4)
+    np.testing.assert_array_equal(image[0, 0], [1, 0, 0, 1])
+    # holes stay transparent
+    assert image[2:8, 2:8, 3].sum() == 0
+    assert image[..., 3].sum() == 100 - 36
+
+    # later geometries are drawn on top, multi-polygons are filled per part
+    parts = MultiPolygon([box(0, 0, 2, 2), box(8, 8, 10, 10)])
+    image = rasterize_polygons(
+        [box(0, 0, 10, 10), parts], ["red", "blue"], 10, 10, (0, 10, 0, 10)
+    )
+    np.testing.assert_array_equal(image[0, 0], [0, 0, 1, 1])
+    np.testing.assert_array_equal(image[9, 9], [0, 0, 1, 1])
+    np.testing.assert_array_equal(image[5, 5], [1, 0, 0, 1])
+
+
+def test_raster_plot():
+    gdf = gpd.read_file(examples.get_path("columbus.shp"))
+    fig, ax = plt.subplots()
+    raster_plot(gdf.geometry, ["C0"] * len(gdf), ax)
+    assert len(ax.images) == 1
+    plt.close(fig)
@@ -3,18 +3,26 @@
 # Bokeh versions are not intended for release
 # but will be picked up later
 
+import json
+
 import esda
 import geopandas as gpd
+import numpy as np
 import pytest
+from bokeh.models import ColumnDataSource, CustomJS, GeoJSONDataSource, Slider
 from libpysal import examples
 from libpysal.weights.contiguity import Queen
+from shapely.geometry import MultiPolygon, Polygon, box
 
+import splot._viz_bokeh as viz_bokeh
 from splot._bk import (
     lisa_cluster,
     moran_scatterplot,
     plot_choropleth,
     plot_local_autocorrelation,
 )
+from splot._viz_bokeh import _P_SLIDER_JS, _geo_source, _p_slider
+from splot._viz_utils import _moran_spots
 
 
 @pytest.mark.skip(reason="to be deprecated")
@@ -27,6 +35,7 @@ def test_plot_choropleth():
 
     TOOLS = "tap,help"
     plot_choropleth(df, "HOVAL", title="columbus", reverse_colors=True, tools=TOOLS)
+    plot_choropleth(df, "HOVAL", columnar=True)
 
 
 @pytest.mark.skip(reason="to be deprecated")
@@ -42,6 +51,8 @@ def test_lisa_cluster():
 
     TOOLS = "tap,reset,help"
     lisa_cluster(moran_loc, df, p=0.05, tools=TOOLS)
+    lisa_cluster(moran_loc, df, p=0.05, columnar=True)
+    lisa_cluster(moran_loc, df, p=0.01, slider=True)
 
 
 @pytest.mark.skip(reason="to be deprecated")
@@ -56,6 +67,7 @@ def test_moran_scatterplot():
     moran_loc = esda.moran.Moran_Local(y, w)
 
     moran_scatterplot(moran_loc, p=0.05)
+    moran_scatterplot(moran_loc, p=0.05, max_points=20)
 
 
 @pytest.mark.skip(reason="to be deprecated")
@@ -70,3 +82,107 @@ def test_plot_local_autocorrelation():
     moran_loc = esda.moran.Moran_Local(y, w)
 
     plot_local_autocorrelation(moran_loc, df, "HOVAL")
+    plot_local_autocorrelation(moran_loc, df, "HOVAL", columnar=True)
+    plot_local_autocorrelation(moran_loc, df, "HOVAL", p=0.01, slider=True)
+
+
+def test_geo_source():
+    triangle = Polygon([(0, 0), (1, 0), (1, 1)])
+    square = Polygon(
+        [(2, 2), (3, 2), (3, 3), (2, 3)], [[(2.2, 2.2), (2.5, 2.5), (2.2, 2.5)]]
+    )
+    df = gpd.GeoDataFrame(
+        {"name": ["a", "b"], "HOVAL": [1.0, 2.0]},
+        geometry=[triangle, MultiPolygon([triangle, square])],
+    )
+    columns = {
+        "cluster_lisa": np.array([0, 3], dtype=np.int8),
+        "bin_choro": np.array([1, 0], dtype=np.int64),
+    }
+
+    source = _geo_source(df, columns, "name", columnar=True)
+    assert isinstance(source, ColumnDataSource)
+    assert set(source.data) == {"cluster_lisa", "bin_choro", "name", "xs", "ys"}
+    # integer codes are sent as they are
+    assert source.data["cluster_lisa"].dtype == np.int8
+    np.testing.assert_array_equal(source.data["bin_choro"], [1, 0])
+    # one ring per polygon, parts of multi-polygons separated by NaN
+    xs, ys = source.data["xs"], source.data["ys"]
+    assert len(xs) == len(ys) == 2
+    assert [len(x) for x in xs] == [4, 10]
+    assert np.isnan(xs[1][4]) and np.isnan(ys[1][4])
+    # the input frame is not modified
+    assert list(df.columns) == ["name", "HOVAL", "geometry"]
+
+    source = _geo_source(df, columns, "name")
+    assert isinstance(source, GeoJSONDataSource)
+    features = json.loads(source.geojson)["features"]
+    assert [f["properties"]["cluster_lisa"] for f in features] == [0, 3]
+    assert set(features[0]["properties"]) == {"cluster_lisa", "bin_choro", "name"}
+
+
+def test_lisa_cluster_default_p(local_statistic, spy):
+    # figures cannot be created with the installed Bokeh, only check the data
+    spy(viz_bokeh, "_lisa_cluster_fig", returns=lambda source, *args, **kwds: source)
+    df = gpd.GeoDataFrame(geometry=[box(i, 0, i + 1, 1) for i in range(6)])
+
+    # without p the map is colored at 0.05
+    source = viz_bokeh.lisa_cluster(local_statistic, df, p=None, columnar=True)
+    np.testing.assert_array_equal(source.data["cluster_lisa"], [1, 2, 0, 0, 3, 0])
+
+
+def test_p_slider():
+    source = ColumnDataSource(
+        {
+            "cluster_lisa": np.array([1, 0, 0], dtype=np.int8),
+            "moranloc_psim": np.array([0.001, 0.02, 0.3]),
+            "moranloc_q": np.array([1, 2, 3]),
+        }
+    )
+    slider = _p_slider(source, ("cluster_lisa",), 0.01)
+    assert isinstance(slider, Slider)
+    assert (slider.start, slider.end, slider.value) == (0, 0.2, 0.01)
+    # thresholds above p_max extend the slider
+    assert _p_slider(source, ["cluster_lisa"], 0.5).end == 0.5
+
+    # the callback recolors the code columns of the source in the browser
+    (callback,) = slider.js_property_callbacks["change:value"]
+    assert isinstance(callback, CustomJS)
+    assert callback.args["source"] is source
+    assert callback.args["fields"] == ["cluster_lisa"]
+    assert callback.code == _P_SLIDER_JS
+
+
+def test_moran_scatterplot_max_points(spy):
+    df = gpd.read_file(examples.get_path("columbus.shp"))
+    w = Queen.from_dataframe(df)
+    w.transform = "r"
+    moran_loc = esda.moran.Moran_Local(df["HOVAL"].values, w)
+
+    # figures cannot be created with the installed Bokeh, only check the data
+    spy(
+        viz_bokeh,
+        "_moran_scatterplot_fig",
+        returns=lambda source, fitline, **kwds: (source, fitline, kwds["title"]),
+    )
+    source, fitline, title = viz_bokeh.moran_scatterplot(
+        moran_loc, p=0.05, max_points=20
+    )
+    z = np.asarray(source.data["moran_z"])
+    assert len(z) == 20
+    assert title == "Moran Scatterplot ({:.1%} of points)".format(20 / len(df))
+    # rows are a subset of the observations, including all hot and cold spots
+    index = np.asarray(source.data["index"])
+    np.testing.assert_array_equal(z, moran_loc.z[index])
+    spots = np.flatnonzero(_moran_spots(moran_loc, 0.05))
+    assert np.isin(spots, index).all()
+    np.testing.assert_array_equal(
+        source.data["cluster_scatter"][np.isin(index, spots)], moran_loc.q[spots]
+    )
+    # the fitline spans all observations
+    assert min(fitline["x"]) == moran_loc.z.min()
+    assert max(fitline["x"]) == moran_loc.z.max()
+
+    source, _, title = viz_bokeh.moran_scatterplot(moran_loc, max_points=None)
+    assert len(source.data["moran_z"]) == len(df)
+    assert title == "Moran Scatterplot"
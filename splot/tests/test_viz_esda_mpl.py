@@ -6,16 +6,22 @@ import pytest
 from esda.moran import Moran, Moran_BV, Moran_BV_matrix, Moran_Local, Moran_Local_BV
 from libpysal import examples
 from libpysal.weights.contiguity import Queen
+from matplotlib import colors
 
+import splot._viz_esda_mpl as viz_esda
 from splot._viz_esda_mpl import (
     _moran_bv_scatterplot,
     _moran_global_scatterplot,
     _moran_loc_bv_scatterplot,
     _moran_loc_scatterplot,
 )
+from splot._viz_utils import moran_hot_cold_spots
 from splot.esda import (
+    batch_lisa_cluster,
     lisa_cluster,
+    local_autocorrelation_explorer,
     moran_facet,
+    moran_fit,
     moran_scatterplot,
     plot_local_autocorrelation,
     plot_moran,
@@ -91,6 +97,29 @@ def test_moran_global_scatterplot():
         moran, zstandard=False, aspect_equal=False, fitline_kwds=dict(color="#4393c3")
     )
     plt.close(fig)
+    # keep spreg.OLS for the fit line
+    fig, _ = _moran_global_scatterplot(moran, fit_method="ols")
+    plt.close(fig)
+
+
+def test_moran_fit():
+    gdf = gpd.read_file(examples.get_path("columbus.shp"))
+    w = Queen.from_dataframe(gdf)
+    w.transform = "r"
+    moran_loc = Moran_Local(gdf["HOVAL"].values, w, permutations=99, seed=12345)
+
+    fit = moran_fit(moran_loc)
+    assert fit.ols is None
+    # the OLS fit of a plot is reused, with its regression diagnostics
+    fig, _ = moran_scatterplot(moran_loc, fit_method="ols")
+    plt.close(fig)
+    ols_fit = moran_fit(moran_loc, fit_method="ols")
+    assert moran_fit(moran_loc, fit_method="ols") is ols_fit
+    np.testing.assert_allclose(
+        [ols_fit.intercept, ols_fit.slope], [fit.intercept, fit.slope], atol=1e-10
+    )
+    np.testing.assert_allclose(ols_fit.ols.betas.ravel(), [fit.intercept, fit.slope])
+    assert ols_fit.ols.r2 >= 0
 
 
 def test_plot_moran_simulation():
@@ -218,6 +247,12 @@ def test_moran_loc_scatterplot():
     )
     plt.close(fig)
 
+    # downsampled points
+    fig, ax = _moran_loc_scatterplot(moran_loc, p=0.05, max_points=20)
+    assert len(ax.collections[0].get_offsets()) == 20
+    assert ax.get_title().endswith("of points)")
+    plt.close(fig)
+
     pytest.raises(ValueError, _moran_loc_scatterplot, moran_bv, p=0.5)
     pytest.warns(
         UserWarning,
@@ -244,6 +279,15 @@ def test_lisa_cluster():
     fig, _ = lisa_cluster(moran_loc, df)
     plt.close(fig)
 
+    # simplified geometries
+    fig, _ = lisa_cluster(moran_loc, df, simplify=True)
+    plt.close(fig)
+
+    # rasterized polygons
+    fig, ax = lisa_cluster(moran_loc, df, raster=True)
+    assert len(ax.images) == 1
+    plt.close(fig)
+
     # test LineStrings
     df_line = _test_LineString()
     moran_loc = _test_calc_moran_loc(df_line, var="Length")
@@ -252,6 +296,52 @@ def test_lisa_cluster():
     plt.close(fig)
 
 
+def test_batch_lisa_cluster(tmp_path):
+    df = _test_data_columbus()
+    w = Queen.from_dataframe(df)
+    w.transform = "r"
+    jobs = {
+        col: Moran_Local(df[col].values, w, permutations=99, seed=12345)
+        for col in ["HOVAL", "CRIME"]
+    }
+
+    paths = batch_lisa_cluster(jobs, df, str(tmp_path / "serial"), n_jobs=1)
+    assert [p.rsplit("/", 1)[-1] for p in paths] == ["HOVAL.png", "CRIME.png"]
+
+    paths = batch_lisa_cluster(
+        list(jobs.items()), df, str(tmp_path / "pool"), n_jobs=2, raster=True
+    )
+    for path in paths:
+        with open(path, "rb") as f:
+            assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+
+
+def test_batch_lisa_cluster_names(tmp_path):
+    # job names are file names inside out_dir
+    for name in ["../outside", "sub/map", "..", ""]:
+        with pytest.raises(ValueError, match="not a plain file name"):
+            batch_lisa_cluster({name: None}, None, str(tmp_path), n_jobs=1)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_batch_lisa_cluster_thresholds(tmp_path, local_statistic, spy):
+    calls = spy(
+        viz_esda, "_render_lisa_cluster", returns=lambda path, *args, **kwds: path
+    )
+    moran_loc = local_statistic
+    # tuples carry their own threshold, others use p
+    jobs = [("all", moran_loc), ("p10", moran_loc, 0.1), ("p01", moran_loc, 0.01)]
+    batch_lisa_cluster(jobs, None, str(tmp_path), n_jobs=1, p=0.05)
+    rendered = {
+        path.rsplit("/", 1)[-1]: list(cluster) for (path, cluster, _), _ in calls
+    }
+    assert rendered == {
+        "all.png": [1, 2, 0, 0, 3, 0],
+        "p10.png": [1, 2, 3, 0, 3, 1],
+        "p01.png": [1, 0, 0, 0, 3, 0],
+    }
+
+
 def test_plot_local_autocorrelation():
     df = _test_data_columbus()
     moran_loc = _test_calc_moran_loc(df)
@@ -259,6 +349,9 @@ def test_plot_local_autocorrelation():
     fig, _ = plot_local_autocorrelation(moran_loc, df, "HOVAL", p=0.05)
     plt.close(fig)
 
+    fig, _ = plot_local_autocorrelation(moran_loc, df, "HOVAL", simplify=0.01)
+    plt.close(fig)
+
     # also test with quadrant and mask
     with pytest.warns(UserWarning, match="Values in `mask` are not the same dtype"):
         fig, _ = plot_local_autocorrelation(
@@ -288,6 +381,31 @@ def test_plot_local_autocorrelation():
         )
 
 
+def test_local_autocorrelation_explorer():
+    df = _test_data_columbus()
+    moran_loc = _test_calc_moran_loc(df)
+    rgba = colors.to_rgba_array(
+        ["lightgrey", "#d7191c", "#abd9e9", "#2c7bb6", "#fdae61"]
+    )
+
+    fig, axs, slider = local_autocorrelation_explorer(moran_loc, df, p=0.05)
+    n_artists = len(axs[0].get_children()) + len(axs[1].get_children())
+    for p in [0.01, 0.2, 0.0, 0.05]:
+        slider.set_val(p)
+        expected = rgba[moran_hot_cold_spots(moran_loc, p)]
+        np.testing.assert_allclose(axs[1].collections[0].get_facecolor(), expected)
+    # colors are updated in place, no artists are added
+    assert n_artists == len(axs[0].get_children()) + len(axs[1].get_children())
+    plt.close(fig)
+
+    # test LineStrings
+    df_line = _test_LineString()
+    moran_loc = _test_calc_moran_loc(df_line, var="Length")
+    fig, _, slider = local_autocorrelation_explorer(moran_loc, df_line)
+    slider.set_val(0.1)
+    plt.close(fig)
+
+
 def test_moran_loc_bv_scatterplot():
     gdf = _test_data()
     x = gdf["Suicids"].values
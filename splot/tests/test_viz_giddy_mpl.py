@@ -83,6 +83,16 @@ def test_dynamic_lisa_vectors():
     dynamic_lisa_vectors(rose, ax=axs[0], color="r")
     plt.close(fig4)
 
+    # one LineCollection for all vectors and one PolyCollection for arrowheads
+    fig5, ax = dynamic_lisa_vectors(rose, collection=True, linewidth=0.5)
+    assert len(ax.collections) == 2
+    assert len(ax.collections[0].get_segments()) == len(rose.Y)
+    plt.close(fig5)
+
+    fig6, ax = dynamic_lisa_vectors(rose, arrows=False, collection=True, c="r")
+    assert len(ax.collections) == 1
+    plt.close(fig6)
+
 
 def test_dynamic_lisa_composite():
     from splot.giddy import dynamic_lisa_composite
@@ -100,3 +110,97 @@ def test_import_ipywidgets_error():
         gdf, _, rose = _data_generation()
 
         dynamic_lisa_composite_explore(rose, gdf)
+
+
+def test_lisa_transitions():
+    from splot._viz_giddy_mpl import _lisa_transitions
+
+    rng = np.random.default_rng(0)
+    clusters = rng.integers(0, 5, size=(200, 4))
+    transitions = _lisa_transitions(clusters)
+    assert transitions.shape == (3, 5, 5)
+    for t in range(3):
+        for i in range(5):
+            for j in range(5):
+                expected = ((clusters[:, t] == i) & (clusters[:, t + 1] == j)).sum()
+                assert transitions[t, i, j] == expected
+    np.testing.assert_array_equal(transitions.sum(axis=(1, 2)), [200] * 3)
+
+
+def test_moran_loc_columns():
+    from splot._viz_giddy_mpl import _moran_loc_columns, _moran_loc_from_rose_calc
+
+    gdf, _, rose = _data_generation()
+    np.random.seed(12345)
+    moran_loc = _moran_loc_columns(gdf, rose.w)
+    state = np.random.get_state()[1].copy()
+    moran_locy = moran_loc("1969_rel")
+    # cached per column, the global random state is not advanced
+    assert moran_loc("1969_rel") is moran_locy
+    np.testing.assert_array_equal(np.random.get_state()[1], state)
+
+    # all columns share the permutations of the captured random state
+    moran_locx = moran_loc("2000_rel")
+    np.random.seed(12345)
+    expected_y, expected_x = _moran_loc_from_rose_calc(rose)
+    np.testing.assert_array_equal(moran_locy.p_sim, expected_y.p_sim)
+    np.testing.assert_array_equal(moran_locx.p_sim, expected_x.p_sim)
+
+    # seeded computations do not depend on the global random state
+    moran_loc = _moran_loc_columns(gdf, rose.w, permutations=99, seed=1)
+    assert moran_loc("1969_rel").permutations == 99
+
+    # the memo is bounded, least recently used columns are dropped
+    moran_loc = _moran_loc_columns(gdf, rose.w, permutations=99, seed=1, maxsize=1)
+    first = moran_loc("1969_rel")
+    moran_loc("2000_rel")
+    assert len(moran_loc.cache) == 1
+    assert moran_loc("1969_rel") is not first
+
+
+def test_moran_loc_from_rose_calc():
+    from splot._viz_giddy_mpl import _moran_loc_from_rose_calc
+
+    _, _, rose = _data_generation()
+    np.random.seed(12345)
+    state = np.random.get_state()[1].copy()
+    moran_locy, moran_locx = _moran_loc_from_rose_calc(rose)
+    # the global random state is read, but not advanced
+    np.testing.assert_array_equal(np.random.get_state()[1], state)
+    again_y, _ = _moran_loc_from_rose_calc(rose)
+    np.testing.assert_array_equal(moran_locy.p_sim, again_y.p_sim)
+
+    # an explicit seed does not depend on the global random state
+    moran_locy, moran_locx = _moran_loc_from_rose_calc(rose, seed=1)
+    np.random.seed(0)
+    again_y, again_x = _moran_loc_from_rose_calc(rose, seed=1)
+    np.testing.assert_array_equal(moran_locy.p_sim, again_y.p_sim)
+    np.testing.assert_array_equal(moran_locx.p_sim, again_x.p_sim)
+
+
+def test_dynamic_lisa_panel():
+    from splot._viz_utils import _stat_cache, moran_hot_cold_spots
+    from splot.giddy import dynamic_lisa_panel
+
+    gdf, _, rose = _data_generation()
+    years = [str(year) + "_rel" for year in range(1969, 2010, 10)]
+    Y = gdf[years].values
+    n_entries = len(_stat_cache)
+    fig, axs, panel = dynamic_lisa_panel(
+        Y, rose.w, permutations=99, seed=12345, labels=years
+    )
+    # periods are classified without filling the shared statistic cache
+    assert len(_stat_cache) == n_entries
+    # trajectories, transitions and one rose chart per step
+    assert len(axs) == 2 + len(years) - 1
+    assert panel.transitions.shape == (len(years) - 1, 5, 5)
+    np.testing.assert_array_equal(
+        panel.clusters[:, 2], moran_hot_cold_spots(panel.moran_locs[2], p=0.05)
+    )
+    np.testing.assert_array_equal(panel.transitions.sum(axis=(1, 2)), len(Y))
+    np.testing.assert_allclose(panel.wY, rose.w.sparse @ Y)
+    plt.close(fig)
+
+    # a single period has no transitions
+    with pytest.raises(ValueError, match="at least two periods"):
+        dynamic_lisa_panel(Y[:, :1], rose.w)
@@ -1,10 +1,14 @@
 import geopandas as gpd
 import libpysal
 import matplotlib.pyplot as plt
+import numpy as np
 import pytest
 from libpysal import examples
+from libpysal.weights import Rook
 from libpysal.weights.contiguity import Queen
+from shapely.geometry import box
 
+from splot._viz_libpysal_mpl import _weights_gdf_rows, _weights_segments
 from splot.libpysal import plot_spatial_weights
 
 
@@ -31,6 +35,10 @@ def test_plot_spatial_weights():
     fig3, _ = plot_spatial_weights(wnp, gdf, nonplanar_edge_kws=dict(color="#4393c3"))
     plt.close(fig3)
 
+    # simplified base layer
+    fig5, _ = plot_spatial_weights(weights, gdf, simplify=True)
+    plt.close(fig5)
+
     # plot in existing figure
     fig4, axs = plt.subplots(1, 3)
     plot_spatial_weights(wnp, gdf, ax=axs[0])
@@ -42,3 +50,90 @@ def test_plot_spatial_weights():
     )
     fig, _ = plot_spatial_weights(weights_index, gdf, indexed_on="CD_GEOCMU")
     plt.close(fig)
+
+
+def test_weights_segments():
+    gdf = gpd.read_file(examples.get_path("columbus.shp"))
+    weights = Queen.from_dataframe(gdf, ids="POLYID")
+    rows = _weights_gdf_rows(weights, gdf, indexed_on="POLYID")
+    np.testing.assert_array_equal(
+        gdf["POLYID"].values[rows], np.asarray(weights.id_order)
+    )
+
+    coords = np.column_stack((gdf.centroid.x.values, gdf.centroid.y.values))[rows]
+    segments, non_planar_segments = _weights_segments(weights, coords, symmetric=False)
+    assert segments.shape == (weights.nonzero, 2, 2)
+    assert non_planar_segments.shape == (0, 2, 2)
+
+    # queen weights are symmetric, so every edge is kept once
+    segments, _ = _weights_segments(weights, coords)
+    assert segments.shape == (weights.nonzero // 2, 2, 2)
+    first = weights.id_order[0]
+    neighbors = sorted(weights.id2i[j] for j in weights.neighbors[first])
+    from_first = segments[: len(neighbors)]
+    np.testing.assert_array_equal(from_first[:, 0], coords[[0] * len(neighbors)])
+    np.testing.assert_array_equal(from_first[:, 1], coords[neighbors])
+
+    # non-planar joins are split off from the planar edges
+    weights.non_planar_joins = {first: [weights.id_order[neighbors[0]]]}
+    segments, non_planar_segments = _weights_segments(weights, coords)
+    assert len(segments) == weights.nonzero // 2 - 1
+    np.testing.assert_array_equal(non_planar_segments[0], from_first[0])
+
+
+def test_weights_segments_asymmetric():
+    gdf = gpd.read_file(examples.get_path("columbus.shp"))
+    knn = libpysal.weights.KNN.from_dataframe(gdf, k=3)
+    coords = np.column_stack((gdf.centroid.x.values, gdf.centroid.y.values))
+    segments, _ = _weights_segments(knn, coords)
+    assert len(segments) == knn.nonzero
+
+    # forcing undirected edges joins mutual neighbors once
+    adjacency = knn.sparse.astype(bool)
+    mutual = adjacency.multiply(adjacency.T).nnz // 2
+    segments, _ = _weights_segments(knn, coords, symmetric=True)
+    assert len(segments) == knn.nonzero - mutual
+
+
+def test_weights_gdf_rows_duplicated_index():
+    gdf = gpd.read_file(examples.get_path("columbus.shp"))
+    weights = Queen.from_dataframe(gdf, use_index=False)
+    gdf.index = [0, 0] + list(range(2, len(gdf)))
+    np.testing.assert_array_equal(_weights_gdf_rows(weights, gdf), np.arange(len(gdf)))
+    fig, ax = plot_spatial_weights(weights, gdf)
+    assert len(ax.collections[-2].get_segments()) == weights.nonzero // 2
+    plt.close(fig)
+
+    # duplicated ids in a column use the last matching row
+    gdf["ID"] = gdf["POLYID"]
+    gdf.loc[gdf.index[-1], "ID"] = 1
+    weights = libpysal.weights.W({1: [2], 2: [1]})
+    rows = _weights_gdf_rows(weights, gdf, indexed_on="ID")
+    assert rows.tolist() == [len(gdf) - 1, 1]
+
+
+def test_weights_gdf_rows_shuffled_index():
+    # a strip of boxes whose index is a permutation of the row positions
+    gdf = gpd.GeoDataFrame(
+        geometry=[box(i, 0, i + 1, 1) for i in range(5)], index=[2, 0, 4, 1, 3]
+    )
+    weights = Rook.from_dataframe(gdf, use_index=False)
+    np.testing.assert_array_equal(_weights_gdf_rows(weights, gdf), np.arange(5))
+    fig, ax = plot_spatial_weights(weights, gdf)
+    segments = np.sort(
+        [sorted(x for x, _ in seg) for seg in ax.collections[-2].get_segments()],
+        axis=0,
+    )
+    np.testing.assert_array_equal(
+        segments, [[0.5, 1.5], [1.5, 2.5], [2.5, 3.5], [3.5, 4.5]]
+    )
+    plt.close(fig)
+
+    # ids of weights built on the index are labels, not positions
+    weights = Rook.from_dataframe(gdf, use_index=True)
+    rows = _weights_gdf_rows(weights, gdf, use_index=True)
+    assert gdf.index[rows].tolist() == list(weights.id_order)
+    with pytest.raises(KeyError):
+        _weights_gdf_rows(libpysal.weights.W({7: [8], 8: [7]}), gdf, use_index=True)
+    with pytest.raises(ValueError, match="not row positions"):
+        _weights_gdf_rows(libpysal.weights.W({7: [8], 8: [7]}), gdf)
@@ -1,6 +1,38 @@
+import gc
+
+import geopandas as gpd
 import matplotlib as mpl
+import numpy as np
+import pytest
+import shapely
+from esda.moran import Moran_Local
+from libpysal import examples
+from libpysal.weights.contiguity import Queen
+from matplotlib.path import Path
+from shapely.geometry import LineString, MultiPolygon, Polygon
 
-from splot._viz_utils import shift_colormap, truncate_colormap
+import splot._viz_utils as viz_utils
+from splot._viz_utils import (
+    _classification_cache,
+    _classify,
+    _cluster_categorical,
+    _cluster_mask,
+    _geometry_cache,
+    _geometry_paths,
+    _LRUCache,
+    _moran_fit,
+    _moran_sample,
+    _moran_scatter_values,
+    _moran_spots,
+    _polygon_xs_ys,
+    _sampled_title,
+    _simplified_gdf,
+    _stat_cache,
+    moran_hot_cold_spots,
+    moran_hot_cold_spots_multi,
+    shift_colormap,
+    truncate_colormap,
+)
 
 
 def test_shift_colormap():
@@ -10,6 +42,227 @@ def test_shift_colormap():
     assert isinstance(map_test, mpl.colors.LinearSegmentedColormap)
 
 
+def test_shift_colormap_cache():
+    first = shift_colormap("RdBu", midpoint=0.3, name="cachedcmap")
+    # repeated calls neither register nor fail to re-register the name
+    second = shift_colormap("RdBu", midpoint=0.3, name="cachedcmap")
+    assert "cachedcmap" not in mpl.colormaps
+    # cached colormaps are copied, so changes do not leak between calls
+    assert first is not second
+    first.set_bad("red")
+    assert second.get_bad()[0] == 0
+    values = np.linspace(0, 1, 11)
+    np.testing.assert_array_equal(first(values), second(values))
+
+
 def test_truncat_colormap():
     map_test_truncate = truncate_colormap("RdBu", minval=0.1, maxval=0.9, n=99)
     assert isinstance(map_test_truncate, mpl.colors.LinearSegmentedColormap)
+
+
+def _test_moran_loc():
+    gdf = gpd.read_file(examples.get_path("columbus.shp"))
+    w = Queen.from_dataframe(gdf)
+    w.transform = "r"
+    return Moran_Local(gdf["HOVAL"].values, w)
+
+
+def test_moran_stat_cache():
+    moran_loc = _test_moran_loc()
+    x, lag = _moran_scatter_values(moran_loc)
+    np.testing.assert_allclose(lag, moran_loc.w.sparse @ moran_loc.z)
+    # repeated calls reuse the cached arrays
+    assert _moran_scatter_values(moran_loc)[1] is lag
+    assert _moran_fit(moran_loc) is _moran_fit(moran_loc)
+    spots = _moran_spots(moran_loc, 0.05)
+    np.testing.assert_array_equal(spots, moran_hot_cold_spots(moran_loc, 0.05))
+    assert _moran_spots(moran_loc, 0.05) is spots
+    assert _moran_spots(moran_loc, 0.1) is not spots
+    assert not spots.flags.writeable
+
+    # entries are dropped together with their statistic
+    n_entries = len(_stat_cache)
+    del moran_loc, x, lag, spots
+    gc.collect()
+    assert len(_stat_cache) < n_entries
+
+    # bounded eviction
+    cache = _LRUCache(maxsize=2)
+    for i in range(3):
+        cache.get((i,), lambda: i)
+    assert len(cache) == 2
+    assert cache.get((0,), lambda: "recomputed") == "recomputed"
+
+    # eviction by size, values larger than the bound are not cached
+    cache = _LRUCache(maxsize=8, maxbytes=10, sizeof=len)
+    cache.get(("a",), lambda: "x" * 6)
+    cache.get(("b",), lambda: "x" * 4)
+    assert (len(cache), cache.nbytes) == (2, 10)
+    cache.get(("c",), lambda: "x" * 3)
+    assert (len(cache), cache.nbytes) == (2, 7)
+    assert cache.get(("d",), lambda: "x" * 11) == "x" * 11
+    assert (len(cache), cache.nbytes) == (2, 7)
+
+
+def test_polygon_xs_ys():
+    triangle = Polygon([(0, 0), (1, 0), (1, 1)])
+    square = Polygon(
+        [(2, 2), (3, 2), (3, 3), (2, 3)], [[(2.2, 2.2), (2.5, 2.5), (2.2, 2.5)]]
+    )
+    xs, ys = _polygon_xs_ys([triangle, MultiPolygon([triangle, square]), Polygon()])
+    assert len(xs) == len(ys) == 3
+    np.testing.assert_array_equal(xs[0], [0, 1, 1, 0])
+    np.testing.assert_array_equal(ys[0], [0, 0, 1, 0])
+    # parts are separated by NaN, holes are dropped
+    np.testing.assert_array_equal(xs[1], [0, 1, 1, 0, np.nan, 2, 3, 3, 2, 2])
+    np.testing.assert_array_equal(ys[1], [0, 0, 1, 0, np.nan, 2, 2, 3, 3, 2])
+    assert len(xs[2]) == len(ys[2]) == 0
+
+
+def test_geometry_paths():
+    triangle = Polygon([(0, 0), (1, 0), (1, 1)])
+    square = Polygon(
+        [(2, 2), (3, 2), (3, 3), (2, 3)], [[(2.2, 2.2), (2.5, 2.5), (2.2, 2.5)]]
+    )
+    paths = _geometry_paths(
+        [triangle, MultiPolygon([triangle, square]), LineString([(0, 0), (1, 1)])]
+    )
+    assert len(paths) == 3
+    np.testing.assert_array_equal(paths[0].vertices, [[0, 0], [1, 0], [1, 1], [0, 0]])
+    assert paths[0].codes.tolist() == [1, 2, 2, Path.CLOSEPOLY]
+    # one path for all parts and holes of a geometry
+    assert (paths[1].codes == Path.MOVETO).sum() == 3
+    # holes wind against their exterior
+    rings = paths[1].to_polygons()
+    area = [
+        (ring[:-1, 0] * ring[1:, 1] - ring[1:, 0] * ring[:-1, 1]).sum()
+        for ring in rings
+    ]
+    assert np.sign(area).tolist() == [1, 1, -1]
+    # lines are left open
+    assert paths[2].codes.tolist() == [Path.MOVETO, Path.LINETO]
+
+
+def test_simplified_gdf():
+    gdf = gpd.read_file(examples.get_path("columbus.shp"))
+    assert _simplified_gdf(gdf) is gdf
+
+    simplified = _simplified_gdf(gdf, simplify=True, plot_width=100, plot_height=100)
+    n_coords = shapely.get_num_coordinates(gdf.geometry.values).sum()
+    assert shapely.get_num_coordinates(simplified.geometry.values).sum() < n_coords
+    assert list(simplified.columns) == list(gdf.columns)
+    assert simplified.crs == gdf.crs
+    # the input is left untouched
+    assert shapely.get_num_coordinates(gdf.geometry.values).sum() == n_coords
+
+    # repeated calls reuse the cached geometries
+    n_entries = len(_geometry_cache)
+    _simplified_gdf(gdf, simplify=True, plot_width=100, plot_height=100)
+    assert len(_geometry_cache) == n_entries
+    _simplified_gdf(gdf, simplify=0.5)
+    assert len(_geometry_cache) == n_entries + 1
+
+
+def test_classify_cache():
+    y = np.random.RandomState(0).normal(size=200)
+    bins = _classify("fisher_jenks", y, 5)
+    n_entries = len(_classification_cache)
+
+    # same values and parameters reuse the cached breaks, on a copy
+    again = _classify("fisher_jenks", y.copy(), 5)
+    assert len(_classification_cache) == n_entries
+    assert again is not bins
+    np.testing.assert_array_equal(again.bins, bins.bins)
+    np.testing.assert_array_equal(again.yb, bins.yb)
+    # arrays are shared read-only instead of copied on every hit
+    assert np.shares_memory(again.yb, bins.yb)
+    with pytest.raises(ValueError):
+        again.yb[:] = 0
+    again.yb = np.zeros_like(again.yb)
+    assert _classify("fisher_jenks", y, 5).yb.any()
+    # the classified values of the caller stay writeable
+    assert y.flags.writeable
+
+    # other values or parameters are classified again
+    _classify("fisher_jenks", y, 4)
+    _classify("fisher_jenks", y + 1, 5)
+    _classify("percentiles", y, [1, 50, 100])
+    assert len(_classification_cache) == n_entries + 3
+    _classify("percentiles", y, (1, 50, 100))
+    assert len(_classification_cache) == n_entries + 3
+
+
+def test_cluster_categorical():
+    cluster = np.array([0, 3, 1, 1, 0, 3], dtype=np.int8)
+    categorical, colors = _cluster_categorical(cluster)
+    # only present clusters, sorted by name as in the legends
+    assert list(categorical.categories) == ["HH", "LL", "ns"]
+    assert colors == ["#d7191c", "#2c7bb6", "lightgrey"]
+    _, colors5, cluster_colors, labels = _cluster_mask(cluster)
+    assert list(categorical) == labels
+    assert colors5 == colors
+    assert cluster_colors[1] == "#2c7bb6"
+
+
+def test_moran_hot_cold_spots_multi(local_statistic):
+    moran_loc = local_statistic
+    ps = [0.1, 0.05, 0.01]
+    codes = moran_hot_cold_spots_multi(moran_loc, ps)
+    assert codes.dtype == np.int8
+    np.testing.assert_array_equal(
+        codes, [[1, 2, 3, 0, 3, 1], [1, 2, 0, 0, 3, 0], [1, 0, 0, 0, 3, 0]]
+    )
+    for p, row in zip(ps, codes):
+        np.testing.assert_array_equal(moran_hot_cold_spots(moran_loc, p), row)
+        np.testing.assert_array_equal(_moran_spots(moran_loc, p), row)
+
+
+def test_moran_spots_multi(local_statistic, spy):
+    moran_loc = local_statistic
+    spots = viz_utils._moran_spots(moran_loc, 0.05)
+    calls = spy(viz_utils, "moran_hot_cold_spots_multi")
+
+    # cached thresholds are reused, missing ones are classified in one call
+    ps = [0.1, 0.05, 0.01]
+    rows = viz_utils._moran_spots_multi(moran_loc, ps)
+    assert [args[1] for args, _ in calls] == [[0.1, 0.05, 0.01]]
+    assert rows[1] is spots
+    assert viz_utils._moran_spots(moran_loc, 0.01) is rows[2]
+    assert len(calls) == 1
+    np.testing.assert_array_equal(
+        rows, [[1, 2, 3, 0, 3, 1], [1, 2, 0, 0, 3, 0], [1, 0, 0, 0, 3, 0]]
+    )
+    assert not rows[0].flags.writeable
+
+
+def test_moran_sample():
+    moran_loc = _test_moran_loc()
+    n = len(moran_loc.z)
+    assert _moran_sample(moran_loc, None) is None
+    assert _moran_sample(moran_loc, n) is None
+    assert _sampled_title("Moran Scatterplot", None, n) == "Moran Scatterplot"
+
+    sample = _moran_sample(moran_loc, 20, p=0.05)
+    assert len(sample) == 20
+    assert _moran_sample(moran_loc, 20, p=0.05) is sample
+    # all hot and cold spots are kept
+    spots = np.flatnonzero(_moran_spots(moran_loc, 0.05))
+    assert np.isin(spots, sample).all()
+    assert _sampled_title("Moran Scatterplot", sample, n) == (
+        "Moran Scatterplot ({:.1%} of points)".format(20 / n)
+    )
+
+    # without significance, every quadrant keeps its share
+    sample = _moran_sample(moran_loc, 10)
+    x, lag = _moran_scatter_values(moran_loc)
+    quadrant = (x < x.mean()) + 2 * (lag < lag.mean())
+    expected = np.bincount(quadrant, minlength=4) * 10 / n
+    drawn = np.bincount(quadrant[sample], minlength=4)
+    assert drawn.sum() == 10
+    assert (np.abs(drawn - expected) < 1).all()
+
+    # hot and cold spots beyond the budget are all kept, with a warning
+    max_points = len(spots) - 1
+    with pytest.warns(UserWarning, match="hot and cold spots are drawn"):
+        sample = _moran_sample(moran_loc, max_points, p=0.05)
+    np.testing.assert_array_equal(sample, spots)
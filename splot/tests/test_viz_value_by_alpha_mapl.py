@@ -1,10 +1,15 @@
 import geopandas as gpd
+import mapclassify
 import matplotlib.pyplot as plt
+import numpy as np
+import pytest
 from libpysal import examples
 
 from splot.mapping import (
     mapclassify_bin,
+    mapclassify_bin_chunks,
     value_by_alpha_cmap,
+    value_by_alpha_cmap_chunks,
     vba_choropleth,
     vba_legend,
 )
@@ -37,6 +42,15 @@ def test_vba_choropleth():
     fig, _ = vba_choropleth("HOVAL", "CRIME", gdf)
     plt.close(fig)
 
+    # plot simplified geometries
+    fig, _ = vba_choropleth("HOVAL", "CRIME", gdf, simplify=True)
+    plt.close(fig)
+
+    # plot as raster image
+    fig, ax = vba_choropleth("HOVAL", "CRIME", gdf, raster=True)
+    assert len(ax.images) == 1
+    plt.close(fig)
+
     # plot with divergent and reverted alpha
     fig, _ = vba_choropleth(
         "HOVAL", "CRIME", gdf, cmap="RdBu", divergent=True, revert_alpha=True
@@ -109,7 +123,10 @@ def test_vba_legend():
     alpha_bins = mapclassify_bin(y, "quantiles")
 
     # plot legend
-    fig, _ = vba_legend(rgb_bins, alpha_bins, cmap="RdBu")
+    fig, ax = vba_legend(rgb_bins, alpha_bins, cmap="RdBu")
+    # the legend grid is drawn as a single image
+    assert len(ax.images) == 1
+    assert ax.images[0].get_array().shape == (5, 5, 4)
     plt.close(fig)
 
 
@@ -148,3 +165,73 @@ def test_mapclassify_bin():
 
     # user_defined
     mapclassify_bin(x, "user_defined", bins=[20, max(x)])
+
+
+def test_mapclassify_bin_sample():
+    y = np.random.RandomState(0).lognormal(size=1000)
+    bins = mapclassify_bin(y, "fisher_jenks", k=4, sample=200)
+    assert bins.sample_size == 200
+    assert bins.k == 4
+    assert bins.bins[-1] == y.max()
+    np.testing.assert_array_equal(bins.yb, np.searchsorted(bins.bins, y))
+    assert bins.counts.sum() == len(y)
+    # sampled breaks classify all values with a fresh UserDefined
+    full = mapclassify.UserDefined(y, bins.bins)
+    assert isinstance(bins, mapclassify.UserDefined)
+    assert bins.get_tss() == full.get_tss()
+    assert bins.adcm == full.adcm
+
+    # samples are reproducible, stratified samples cover the sorted values
+    again = mapclassify_bin(y, "fisher_jenks", k=4, sample=200)
+    np.testing.assert_array_equal(again.bins, bins.bins)
+    stratified = mapclassify_bin(y, "quantiles", sample=200, sampling="stratified")
+    assert stratified.sample_size == 200
+    assert stratified.counts.sum() == len(y)
+
+    # small arrays are classified completely
+    assert not hasattr(mapclassify_bin(y, "quantiles", sample=5000), "sample_size")
+    with pytest.raises(ValueError):
+        mapclassify_bin(y, "quantiles", sample=200, sampling="systematic")
+    # breaks of these schemes are not estimated from the values
+    with pytest.raises(ValueError):
+        mapclassify_bin(y, "equal_interval", sample=200)
+    with pytest.raises(ValueError):
+        mapclassify_bin(y, "user_defined", bins=[1, 2], sample=200)
+
+
+def test_value_by_alpha_cmap_chunks(tmp_path):
+    rs = np.random.RandomState(0)
+    x, y = rs.normal(size=1000), rs.normal(size=1000)
+    expected, _ = value_by_alpha_cmap(x, y, cmap="RdBu", divergent=True)
+
+    # arrays, memory-mapped .npy files and callables yielding blocks
+    np.save(tmp_path / "x.npy", x)
+    sources = [
+        (x, y),
+        (str(tmp_path / "x.npy"), y),
+        (lambda: np.split(x, 4), lambda: np.split(y, 4)),
+    ]
+    for x_source, y_source in sources:
+        rgba, _ = value_by_alpha_cmap_chunks(
+            x_source, y_source, cmap="RdBu", divergent=True, chunksize=300
+        )
+        np.testing.assert_allclose(np.concatenate(list(rgba)), expected)
+
+    with pytest.raises(TypeError):
+        value_by_alpha_cmap_chunks(iter(np.split(x, 4)), y)
+
+
+def test_mapclassify_bin_chunks():
+    y = np.random.RandomState(0).lognormal(size=1000)
+    bins, yb = mapclassify_bin_chunks(y, "quantiles", k=4, sample=200, chunksize=300)
+    assert bins.sample_size == 200
+    assert bins.bins[-1] == y.max()
+    yb = list(yb)
+    assert [len(chunk) for chunk in yb] == [300, 300, 300, 100]
+    np.testing.assert_array_equal(np.concatenate(yb), np.searchsorted(bins.bins, y))
+
+    # small columns are classified completely
+    bins, yb = mapclassify_bin_chunks(y, "quantiles", k=4, chunksize=300)
+    np.testing.assert_array_equal(
+        np.concatenate(list(yb)), mapclassify_bin(y, "quantiles", k=4).yb
+    )